@@ -15,4 +15,3 @@ class PhoneChangeForm(forms.Form):
             }
         ),
     )
-
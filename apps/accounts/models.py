@@ -1,2 +1 @@
-
 # Create your models here.
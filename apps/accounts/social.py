@@ -0,0 +1,183 @@
+"""
+Process-level cache of allauth's social apps, and of the headless config response.
+
+allauth lists the `SocialApp` rows on every social login redirect, every login page
+(its provider buttons) and every headless config request. `SocialAccountAdapter`
+lists them from a copy kept in each process instead, reloaded when a version kept in
+the `SOCIALACCOUNT_APP_CACHE` cache changes. Saving or deleting an app, e.g. in the
+admin, bumps the version once the transaction commits. Only processes sharing that
+cache see the bump: the version also expires after `SOCIALACCOUNT_APP_CACHE_TIMEOUT`
+seconds, so with a per-process cache (the default) other workers reload at most that
+long after a change. Apps configured in `settings.SOCIALACCOUNT_PROVIDERS` never
+touch the database and are built from those settings on each listing.
+
+The cached apps are shared between requests and threads: treat them as read-only.
+"""
+
+import hashlib
+import time
+import warnings
+from functools import wraps
+
+from allauth import app_settings as allauth_settings
+from allauth.socialaccount import app_settings as socialaccount_settings
+from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
+from allauth.socialaccount.models import SocialApp
+from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+
+from django_project.metrics import registry
+
+VERSION_KEY = "socialapps:version"
+# Fields of a SocialApp that an app in SOCIALACCOUNT_PROVIDERS may set
+APP_FIELDS = ("name", "provider_id", "client_id", "secret", "key", "settings")
+
+# (version, apps) of this process
+_apps = (None, ())
+# {(path, site id, version): (content, content type, etag)} of the headless config
+_configs = {}
+
+
+def version_cache():
+    return caches[settings.SOCIALACCOUNT_APP_CACHE]
+
+
+def version_timeout():
+    # 0 keeps the version until an app changes
+    return settings.SOCIALACCOUNT_APP_CACHE_TIMEOUT or None
+
+
+def version():
+    return version_cache().get_or_set(VERSION_KEY, time.time_ns, timeout=version_timeout())
+
+
+def social_apps():
+    """All database-backed social apps, loaded once per version."""
+    global _apps
+    current = version()
+    cached_version, apps = _apps
+    registry.inc(
+        "django_cache_lookups_total", cache="socialapps", result="hit" if cached_version == current else "miss"
+    )
+    if cached_version != current:
+        queryset = SocialApp.objects.order_by("pk")
+        if allauth_settings.SITES_ENABLED:
+            queryset = queryset.prefetch_related("sites")
+        apps = tuple(queryset)
+        for app in apps:
+            app.site_ids = {site.pk for site in app.sites.all()} if allauth_settings.SITES_ENABLED else set()
+        _apps = (current, apps)
+    return apps
+
+
+def invalidate():
+    transaction.on_commit(lambda: version_cache().set(VERSION_KEY, time.time_ns(), timeout=version_timeout()))
+
+
+@receiver(post_save, sender=SocialApp)
+@receiver(post_delete, sender=SocialApp)
+def social_app_changed(sender, **kwargs):
+    invalidate()
+
+
+if allauth_settings.SITES_ENABLED:
+
+    @receiver(m2m_changed, sender=SocialApp.sites.through)
+    def social_app_sites_changed(sender, action, **kwargs):
+        if action.startswith("post_"):
+            invalidate()
+
+
+@checks.register(checks.Tags.caches)
+def check_version_cache(app_configs, **kwargs):
+    if settings.SOCIALACCOUNT_APP_CACHE_TIMEOUT or not isinstance(version_cache(), LocMemCache):
+        return []
+    return [
+        checks.Warning(
+            "SOCIALACCOUNT_APP_CACHE_TIMEOUT is 0 with a per-process SOCIALACCOUNT_APP_CACHE: "
+            "other workers keep listing changed social apps until they restart.",
+            hint="Point SOCIALACCOUNT_APP_CACHE at a cache shared by all workers, or set a timeout.",
+            id="accounts.W001",
+        )
+    ]
+
+
+def settings_apps(provider=None, client_id=None):
+    """{provider: [apps]} configured in SOCIALACCOUNT_PROVIDERS, matching as allauth does."""
+    provider_to_apps = {}
+    for name, config in socialaccount_settings.PROVIDERS.items():
+        app_configs = config.get("APPS")
+        if app_configs is None:
+            app_configs = [config["APP"]] if config.get("APP") is not None else []
+        for app_config in app_configs:
+            app = SocialApp(provider=name)
+            for field in APP_FIELDS:
+                if field in app_config:
+                    setattr(app, field, app_config[field])
+            if "certificate_key" in app_config:
+                warnings.warn("'certificate_key' should be moved into app.settings", stacklevel=2)
+                app.settings["certificate_key"] = app_config["certificate_key"]
+            if (not provider or provider in (app.provider, app.provider_id)) and (
+                not client_id or app.client_id == client_id
+            ):
+                provider_to_apps.setdefault(name, []).append(app)
+    return provider_to_apps
+
+
+class SocialAccountAdapter(DefaultSocialAccountAdapter):
+    def list_apps(self, request, provider=None, client_id=None):
+        site_id = get_current_site(request).pk if request and allauth_settings.SITES_ENABLED else None
+        # Same matching and order as allauth's query: database apps grouped by provider, then settings apps
+        provider_to_apps = {}
+        for app in social_apps():
+            if (
+                (site_id is None or site_id in app.site_ids)
+                and (not provider or provider in (app.provider, app.provider_id))
+                and (not client_id or app.client_id == client_id)
+            ):
+                provider_to_apps.setdefault(app.provider, []).append(app)
+        for name, apps in settings_apps(provider=provider, client_id=client_id).items():
+            provider_to_apps.setdefault(name, []).extend(apps)
+        return [app for apps in provider_to_apps.values() for app in apps]
+
+
+def cached_config(view):
+    """
+    Serve allauth headless's config view from memory, rebuilt when the social apps
+    change, with an ETag: clients revalidate (`Cache-Control: no-cache`) and get a
+    304 while it still matches.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+        site_id = get_current_site(request).pk if allauth_settings.SITES_ENABLED else None
+        key = (request.path, site_id, version())
+        if key not in _configs:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            # Configs of older versions are never served again
+            for stale in [cached for cached in _configs if cached[2] != key[2]]:
+                _configs.pop(stale, None)
+            etag = f'"{hashlib.sha256(response.content).hexdigest()[:32]}"'
+            _configs[key] = (response.content, response["Content-Type"], etag)
+        content, content_type, etag = _configs[key]
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    return wrapper
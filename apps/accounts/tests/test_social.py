@@ -0,0 +1,134 @@
+import json
+import time
+from unittest import mock, skipUnless
+
+from allauth.socialaccount.adapter import get_adapter
+from allauth.socialaccount.models import SocialApp
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.social import VERSION_KEY, cached_config, check_version_cache
+
+
+class SocialAppCacheTests(TestCase):
+    """Test cases for the process-level cache of social apps"""
+
+    def setUp(self):
+        cache.delete(VERSION_KEY)
+        self.app = SocialApp.objects.create(provider="google", name="Google", client_id="google-id", secret="s")
+
+    def test_apps_are_listed_from_memory(self):
+        """Test that listing the apps again doesn't query the database"""
+        adapter = get_adapter()
+        self.assertEqual(adapter.list_apps(None), [self.app])
+        with self.assertNumQueries(0):
+            self.assertEqual(adapter.list_apps(None, provider="google"), [self.app])
+            self.assertEqual(adapter.list_apps(None, provider="github"), [])
+            self.assertEqual(adapter.list_apps(None, client_id="other-id"), [])
+
+    def test_saving_an_app_reloads_them(self):
+        """Test that a saved or deleted app is seen once the transaction commits"""
+        adapter = get_adapter()
+        adapter.list_apps(None)
+        with self.captureOnCommitCallbacks(execute=True):
+            SocialApp.objects.create(provider="github", name="GitHub", client_id="github-id", secret="s")
+        self.assertEqual([app.provider for app in adapter.list_apps(None)], ["google", "github"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.app.delete()
+        self.assertEqual([app.provider for app in adapter.list_apps(None)], ["github"])
+
+    def test_changes_from_other_workers_are_seen_after_the_timeout(self):
+        """Test that the version expires, so a change that bumped it elsewhere is seen"""
+        adapter = get_adapter()
+        adapter.list_apps(None)
+        # Another worker's change: this process's cache isn't bumped
+        SocialApp.objects.filter(pk=self.app.pk).update(name="Renamed")
+        self.assertEqual(adapter.list_apps(None)[0].name, "Google")
+        later = time.time() + settings.SOCIALACCOUNT_APP_CACHE_TIMEOUT + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(adapter.list_apps(None)[0].name, "Renamed")
+
+    @override_settings(
+        SOCIALACCOUNT_PROVIDERS={
+            "github": {"APPS": [{"client_id": "github-id", "secret": "s"}, {"client_id": "other-id", "secret": "s"}]},
+            "google": {"APP": {"client_id": "settings-id", "secret": "s"}},
+        }
+    )
+    def test_settings_apps_follow_the_database_apps(self):
+        """Test that apps from SOCIALACCOUNT_PROVIDERS are listed after the database ones and filtered the same way"""
+        adapter = get_adapter()
+        apps = adapter.list_apps(None)
+        self.assertEqual(
+            [(app.provider, app.client_id) for app in apps],
+            [("google", "google-id"), ("google", "settings-id"), ("github", "github-id"), ("github", "other-id")],
+        )
+        self.assertIsNone(apps[1].pk)
+        self.assertEqual(
+            [app.client_id for app in adapter.list_apps(None, provider="github")], ["github-id", "other-id"]
+        )
+        self.assertEqual([app.provider for app in adapter.list_apps(None, client_id="other-id")], ["github"])
+
+    def test_check_warns_about_a_per_process_cache_without_timeout(self):
+        """Test that a version kept forever in a per-process cache is reported"""
+        self.assertEqual(check_version_cache(None), [])
+        with override_settings(SOCIALACCOUNT_APP_CACHE_TIMEOUT=0):
+            self.assertEqual([warning.id for warning in check_version_cache(None)], ["accounts.W001"])
+
+    def test_login_page_does_not_query_apps(self):
+        """Test that the login page lists its provider buttons without querying the apps"""
+        self.client.get(reverse("account_login"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("account_login"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if "socialaccount_socialapp" in query["sql"]])
+
+
+class CachedConfigTests(TestCase):
+    """Test cases for the cached headless config response"""
+
+    def setUp(self):
+        cache.delete(VERSION_KEY)
+        self.calls = 0
+
+        def view(request):
+            self.calls += 1
+            return JsonResponse({"providers": self.calls})
+
+        self.view = cached_config(view)
+        self.factory = RequestFactory()
+
+    def test_config_is_built_once(self):
+        """Test that the config is built once and revalidated with its ETag"""
+        response = self.view(self.factory.get("/_allauth/browser/v1/config"))
+        self.assertEqual(json.loads(response.content), {"providers": 1})
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        again = self.view(self.factory.get("/_allauth/browser/v1/config"))
+        self.assertEqual(again.content, response.content)
+        not_modified = self.view(self.factory.get("/_allauth/browser/v1/config", HTTP_IF_NONE_MATCH=response["ETag"]))
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(self.calls, 1)
+
+    def test_app_changes_rebuild_the_config(self):
+        """Test that saving a social app rebuilds the config with a new ETag"""
+        response = self.view(self.factory.get("/_allauth/browser/v1/config"))
+        with self.captureOnCommitCallbacks(execute=True):
+            SocialApp.objects.create(provider="google", name="Google", client_id="google-id", secret="s")
+        rebuilt = self.view(self.factory.get("/_allauth/browser/v1/config", HTTP_IF_NONE_MATCH=response["ETag"]))
+        self.assertEqual(rebuilt.status_code, 200)
+        self.assertEqual(json.loads(rebuilt.content), {"providers": 2})
+        self.assertNotEqual(rebuilt["ETag"], response["ETag"])
+
+    @skipUnless(settings.ENABLE_HEADLESS, "allauth headless is disabled")
+    def test_config_route_is_served_from_memory(self):
+        """Test that the routed headless config goes through the cache"""
+        response = self.client.get("/_allauth/browser/v1/config")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("socialaccount", json.loads(response.content)["data"])
+        not_modified = self.client.get("/_allauth/browser/v1/config", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
@@ -88,6 +88,28 @@ class ProfileViewTests(TestCase):
             f"Phone number {phone} not found in response",
         )
 
+    def test_profile_fragment_is_cached(self):
+        """Test that a repeated visit reuses the cached profile fragment"""
+        self.client.login(username="testuser", password="testpass123")
+        self.client.get(self.profile_url)
+        # Username and email are cached; render a changed value to prove it is not re-rendered
+        User.objects.filter(pk=self.user.pk).update(first_name="Renamed")
+        response = self.client.get(self.profile_url)
+        self.assertNotContains(response, "Renamed")
+
+    def test_profile_fragment_is_invalidated_by_profile_changes(self):
+        """Test that changing the phone or the user shows up immediately"""
+        self.client.login(username="testuser", password="testpass123")
+        self.client.get(self.profile_url)
+
+        self.client.post(reverse("account_change_phone"), {"phone": "+256781435857"})
+        self.assertContains(self.client.get(self.profile_url), "256781435857")
+
+        self.user.refresh_from_db()
+        self.user.first_name = "Renamed"
+        self.user.save(update_fields=["first_name"])
+        self.assertContains(self.client.get(self.profile_url), "Renamed")
+
 
 class PhoneChangeViewTests(TestCase):
     """Test cases for PhoneChangeView"""
@@ -283,3 +305,11 @@ class PhoneChangeViewTests(TestCase):
         # Should contain form elements
         self.assertContains(response, "phone", count=None)  # Phone field should be present
         self.assertContains(response, "Change Phone")  # Submit button text
+
+    def test_phone_change_post_with_same_phone_does_not_write(self):
+        """Test that submitting the current phone leaves the profile untouched"""
+        profile = Profile.objects.create(user=self.user, phone="+256781435857")
+        self.client.login(username="testuser", password="testpass123")
+        response = self.client.post(self.phone_change_url, {"phone": "+256781435857"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Profile.objects.get(pk=profile.pk).modified, profile.modified)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
@@ -8,19 +9,21 @@ from apps.accounts.forms import PhoneChangeForm
 from apps.users.models import Profile
 
 
-@method_decorator(login_required, name="dispatch")
+# On `get`, not `dispatch`: login_required only checks the user asynchronously on async methods
+@method_decorator(login_required, name="get")
 class ProfileView(TemplateView):
     template_name = "account/profile.html"
 
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        # The profile if it exists, otherwise None
+        profile = await Profile.objects.filter(user=user).afirst()
+        return self.render_to_response(self.get_context_data(user=user, profile=profile, **kwargs))
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        context["user"] = user
-        # Get profile if it exists, otherwise None
-        try:
-            context["profile"] = user.profile
-        except Profile.DoesNotExist:
-            context["profile"] = None
+        # The page body is cached per user, keyed by the user's and profile's modification times
+        context["fragment_cache_timeout"] = settings.FRAGMENT_CACHE_TIMEOUT
         return context
 
 
@@ -42,14 +45,13 @@ class PhoneChangeView(FormView):
 
     def form_valid(self, form):
         user = self.request.user
-        profile, created = Profile.objects.get_or_create(user=user)
-        phone = form.cleaned_data.get("phone")
         # Handle empty phone - set to None if empty string or None
-        if phone:
+        phone = form.cleaned_data.get("phone") or None
+        profile, created = Profile.objects.get_or_create(user=user, defaults={"phone": phone})
+        if not created:
             profile.phone = phone
-        else:
-            profile.phone = None
-        profile.save()
+            # Writes the phone only if it changed (see TimeStampedModel)
+            profile.save()
         messages.success(self.request, "Phone number updated successfully.")
         return redirect("account_profile")
 
@@ -315,3 +315,18 @@ class AccountEndpointTests(APITestCase):
         self.assertIsNotNone(
             re.search(url_pattern, email_body), "Properly formatted verification URL not found in email"
         )
+
+    def test_token_refresh(self):
+        """Test that a refresh token from registration can be exchanged for a new access token"""
+        data = {
+            "email": "refresh@email.com",
+            "password1": "testpassword",
+            "password2": "testpassword",
+        }
+        response = self.client.post(self.registration_url, data, format="json")
+        self.assertEqual(response.status_code, 201)
+
+        url = reverse("accounts:token_refresh")
+        response = self.client.post(url, {"refresh": response.data["refresh"]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.data)
@@ -6,6 +6,8 @@ from .views import (
     PasswordChangeView,
     PasswordResetConfirmView,
     PasswordResetView,
+    RegisterView,
+    TokenRefreshView,
     UserDetailsView,
 )
 
@@ -14,6 +16,7 @@ app_name = "accounts"
 urlpatterns = [
     path("login/", LoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(), name="logout"),
+    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("password/change/", PasswordChangeView.as_view(), name="password_change"),
     path("password/reset/", PasswordResetView.as_view(), name="password_reset"),
     path(
@@ -21,6 +24,8 @@ urlpatterns = [
         PasswordResetConfirmView.as_view(),
         name="password_reset_confirm",
     ),
+    # Takes precedence over the RegisterView included from dj_rest_auth below
+    path("registration/", RegisterView.as_view(), name="rest_register"),
     path("registration/", include("dj_rest_auth.registration.urls")),
     path("user/", UserDetailsView.as_view(), name="user_details"),
 ]
@@ -1,15 +1,28 @@
+from asgiref.sync import sync_to_async
+from dj_rest_auth.jwt_auth import get_refresh_view
+from dj_rest_auth.registration.views import RegisterView as DefaultRegisterView
 from dj_rest_auth.views import LoginView as DefaultLoginView
 from dj_rest_auth.views import PasswordChangeView as DefaultPasswordChangeView
 from dj_rest_auth.views import PasswordResetConfirmView as DefaultPasswordResetConfirmView
 from dj_rest_auth.views import PasswordResetView as DefaultPasswordResetView
 from django.contrib.auth import get_user_model
+from django.utils.decorators import method_decorator
 from rest_framework.generics import RetrieveUpdateAPIView
 
+from apps.api.users.serializers import UserDetailSerializer
+from django_project.async_views import AsyncAPIViewMixin
+from django_project.compression import no_compression
+from django_project.metrics import registry
+
 User = get_user_model()
 
 
+# Responses carrying tokens are never compressed (BREACH)
+@method_decorator(no_compression, name="dispatch")
 class LoginView(DefaultLoginView):
-    pass
+    throttle_scope = "login"
+    # Also throttled per submitted account, whatever address the attempts come from
+    throttle_account_fields = ("email", "username")
 
 
 class LogoutView(DefaultLoginView):
@@ -22,20 +35,49 @@ class PasswordChangeView(DefaultPasswordChangeView):
 
 
 class PasswordResetView(DefaultPasswordResetView):
-    pass
+    throttle_scope = "password_reset"
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        registry.inc("auth_events_total", event="password_reset_request")
+        return response
 
 
 class PasswordResetConfirmView(DefaultPasswordResetConfirmView):
-    pass
+    throttle_scope = "password_reset"
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        registry.inc("auth_events_total", event="password_reset")
+        return response
+
 
+@method_decorator(no_compression, name="dispatch")
+class RegisterView(DefaultRegisterView):
+    throttle_scope = "registration"
 
-class UserDetailsView(RetrieveUpdateAPIView):
-    from apps.api.users.serializers import UserDetailSerializer
 
+@method_decorator(no_compression, name="dispatch")
+class TokenRefreshView(get_refresh_view()):
+    pass
+
+
+class UserDetailsView(AsyncAPIViewMixin, RetrieveUpdateAPIView):
     serializer_class = UserDetailSerializer
 
     def get_object(self):
+        # Loaded by the (async) authentication
         return self.request.user
 
+    async def get(self, request, *args, **kwargs):
+        return self.retrieve(request, *args, **kwargs)
+
+    async def put(self, request, *args, **kwargs):
+        # Validation checks username/email uniqueness and saving writes: both stay synchronous
+        return await sync_to_async(self.update)(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await sync_to_async(self.partial_update)(request, *args, **kwargs)
+
     def get_queryset(self):
         return User.objects.all()
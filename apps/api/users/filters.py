@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django_filters import rest_framework as filters
+
+from apps.users.search import search
+
+User = get_user_model()
+
+
+class UserFilter(filters.FilterSet):
+    # Full-text search over names, email and phone, best matches first
+    search = filters.CharFilter(method="filter_search")
+
+    class Meta:
+        model = User
+        fields = {
+            "username": ["exact", "istartswith"],
+            "email": ["iexact", "istartswith"],
+            "is_active": ["exact"],
+            "is_staff": ["exact"],
+            "date_joined": ["gte", "lte"],
+            "modified": ["gte", "lte"],
+        }
+
+    def filter_search(self, queryset, name, value):
+        return search(queryset, value)
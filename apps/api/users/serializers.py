@@ -1,3 +1,4 @@
+from auditlog.models import LogEntry
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
@@ -15,3 +16,28 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = "__all__"
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """What any signed-in user may see of other users: no password, permissions or groups."""
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "email", "first_name", "last_name", "is_active", "date_joined"]
+
+
+class UserChangeSerializer(serializers.ModelSerializer):
+    phone = serializers.CharField(source="profile.phone", default=None)
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "email", "first_name", "last_name", "is_staff", "date_joined", "modified", "phone"]
+
+
+class LogEntrySerializer(serializers.ModelSerializer):
+    action = serializers.CharField(source="get_action_display")
+    changes = serializers.JSONField(source="changes_dict")
+
+    class Meta:
+        model = LogEntry
+        fields = ["id", "timestamp", "action", "actor", "actor_email", "changes", "remote_addr", "cid"]
@@ -0,0 +1,271 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.users.models import Profile
+
+User = get_user_model()
+
+
+class UserExportEndpointTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("users:users-export")
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@email.com", password="testpassword", is_staff=True
+        )
+        self.user = User.objects.create_user(username="jane", email="jane@email.com", password="testpassword")
+        Profile.objects.create(user=self.user, phone="+256781435857")
+        User.objects.create_user(username="inactive", email="inactive@email.com", is_active=False)
+
+    def read(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_export_requires_admin(self):
+        """Test that non-staff users cannot export users"""
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_csv_with_selected_fields(self):
+        """Test that the CSV export streams the selected fields including the profile phone"""
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, {"fields": "username,phone"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(self.read(response).decode())))
+        self.assertEqual(rows[0], ["username", "phone"])
+        self.assertIn(["jane", "+256781435857"], rows)
+        self.assertIn(["admin", ""], rows)
+        self.assertEqual(len(rows), 4)
+
+    def test_export_applies_list_filters(self):
+        """Test that the export honours the same filters as the list endpoint"""
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, {"is_active": "false", "output": "jsonl"})
+
+        lines = self.read(response).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["username"], "inactive")
+
+    def test_export_gzip(self):
+        """Test that the export can be gzip-compressed on the fly"""
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, {"gzip": "1", "fields": "email"})
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="users.csv.gz"', response["Content-Disposition"])
+        content = gzip.decompress(self.read(response)).decode()
+        self.assertIn("jane@email.com", content)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        """Test that under ASGI the export is an async stream, gzip included"""
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(self.url, {"gzip": "1", "fields": "username,phone"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = gzip.decompress(b"".join([chunk async for chunk in response.streaming_content])).decode()
+        self.assertEqual(content.splitlines()[0], "username,phone")
+        self.assertIn("jane,+256781435857", content)
+        self.assertEqual(len(content.splitlines()), 4)
+
+    def test_export_rejects_unknown_fields(self):
+        """Test that sensitive or unknown fields cannot be exported"""
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, {"fields": "username,password"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
+
+
+class UserBatchEndpointTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("users:users-batch")
+        self.jane = User.objects.create_user(username="jane", email="jane@email.com", password="testpassword")
+        self.john = User.objects.create_user(username="john", email="John@Email.com", password="testpassword")
+        self.client.force_authenticate(self.jane)
+
+    def test_batch_requires_authentication(self):
+        """Test that anonymous users cannot look users up"""
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url, {"ids": self.jane.pk})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_batch_by_ids(self):
+        """Test that users come back in request order, in one query, with missing ids listed"""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"ids": f"{self.john.pk},999,{self.jane.pk},{self.john.pk}"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user["username"] for user in response.data["results"]], ["john", "jane"])
+        self.assertEqual(response.data["missing"], [999])
+
+    def test_batch_hides_credentials_and_permissions(self):
+        """Test that looked up users come without password, superuser flag, groups or permissions"""
+        response = self.client.get(self.url, {"ids": self.john.pk})
+
+        (user,) = response.data["results"]
+        for field in ("password", "is_superuser", "is_staff", "groups", "user_permissions"):
+            self.assertNotIn(field, user)
+
+    def test_batch_reports_ids_out_of_range_as_missing(self):
+        """Test that ids no primary key can hold are missing rather than an error"""
+        response = self.client.get(self.url, {"ids": f"99999999999999999999,{self.jane.pk}"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user["username"] for user in response.data["results"]], ["jane"])
+        self.assertEqual(response.data["missing"], [99999999999999999999])
+
+    def test_batch_by_emails(self):
+        """Test that emails are matched case-insensitively"""
+        response = self.client.get(self.url, {"emails": "john@email.com, nobody@email.com"})
+
+        self.assertEqual([user["username"] for user in response.data["results"]], ["john"])
+        self.assertEqual(response.data["missing"], ["nobody@email.com"])
+
+    def test_batch_rejects_invalid_input(self):
+        """Test that bad ids, both or neither parameter and oversized batches are rejected"""
+        for params in (
+            {},
+            {"ids": "1", "emails": "jane@email.com"},
+            {"ids": "1,x"},
+            {"ids": ",".join(map(str, range(101)))},
+        ):
+            with self.subTest(params):
+                self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(USER_CHANGES_SETTLE_SECONDS=0)
+class UserChangesEndpointTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("users:users-changes")
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@email.com", password="testpassword", is_staff=True
+        )
+        self.jane = User.objects.create_user(username="jane", email="jane@email.com", password="testpassword")
+        self.john = User.objects.create_user(username="john", email="john@email.com", password="testpassword")
+        self.client.force_authenticate(self.admin)
+
+    def sync(self, watermark=None, **params):
+        response = self.client.get(self.url, {"watermark": watermark or "", **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_changes_require_admin(self):
+        """Test that non-staff users cannot read the feed"""
+        self.client.force_authenticate(self.jane)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_full_then_incremental_sync(self):
+        """Test that a sync returns everything once, then only what changed, tombstones included"""
+        data = self.sync()
+        self.assertEqual([user["username"] for user in data["results"]], ["admin", "jane", "john"])
+        self.assertFalse(data["more"])
+        self.assertEqual(self.sync(data["watermark"])["results"], [])
+
+        Profile.objects.create(user=self.jane, phone="+256781435857")
+        self.john.is_active = False
+        self.john.save()
+        deleted_pk = self.admin.pk
+        self.admin.delete()
+        self.client.force_authenticate(User(is_staff=True))
+
+        changes = self.sync(data["watermark"])
+        self.assertEqual(
+            [(user["username"], user["phone"]) for user in changes["results"]], [("jane", "+256781435857")]
+        )
+        self.assertEqual(
+            changes["tombstones"],
+            [{"id": self.john.pk, "reason": "deactivated"}, {"id": deleted_pk, "reason": "deleted"}],
+        )
+
+    def test_resume_in_pages(self):
+        """Test that small pages resume where the last one stopped, without repeats"""
+        usernames, watermark, more = [], None, True
+        while more:
+            data = self.sync(watermark, limit=1)
+            usernames += [user["username"] for user in data["results"]]
+            watermark, more = data["watermark"], data["more"]
+        self.assertEqual(usernames, ["admin", "jane", "john"])
+
+    @override_settings(USER_CHANGES_SETTLE_SECONDS=60)
+    def test_recent_changes_wait_to_settle(self):
+        """Test that changes younger than USER_CHANGES_SETTLE_SECONDS are held back"""
+        self.assertEqual(self.sync()["results"], [])
+
+    def test_invalid_parameters(self):
+        """Test that malformed watermarks and limits are rejected"""
+        for params in ({"watermark": "nope"}, {"limit": "0"}, {"limit": "x"}):
+            with self.subTest(params):
+                self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UserAuditEndpointTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@email.com", password="testpassword", is_staff=True
+        )
+        self.jane = User.objects.create_user(username="jane", email="jane@email.com", password="testpassword")
+        self.url = reverse("users:users-audit", args=[self.jane.pk])
+        self.client.force_authenticate(self.admin)
+
+    def test_audit_timeline(self):
+        """Test that a user's audit entries are listed newest first"""
+        jane = User.objects.get(pk=self.jane.pk)
+        jane.first_name = "Jane"
+        jane.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry["action"] for entry in response.data["results"]], ["update", "create"])
+        self.assertEqual(response.data["results"][0]["changes"], {"first_name": ["", "Jane"]})
+        self.assertIsNone(response.data["next"])
+
+    def test_audit_requires_admin_and_valid_cursor(self):
+        """Test that non-staff users are refused and malformed cursors rejected"""
+        self.assertEqual(self.client.get(self.url, {"cursor": "nope"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(self.jane)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class UserStatsEndpointTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("users:users-stats")
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@email.com", password="testpassword", is_staff=True
+        )
+        self.jane = User.objects.create_user(username="jane", email="jane@email.com", password="testpassword")
+        self.client.force_authenticate(self.admin)
+
+    def test_stats(self):
+        """Test that totals and per-day stats are served from the rollups"""
+        today = timezone.localdate()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["totals"]["signups"], 2)
+        self.assertEqual(response.data["totals"]["staff"], 1)
+        self.assertEqual([(day["day"], day["signups"]) for day in response.data["days"]], [(today, 2)])
+
+        response = self.client.get(self.url, {"until": (today - timedelta(days=1)).isoformat()})
+        self.assertEqual(response.data["days"], [])
+        self.assertEqual(response.data["totals"]["signups"], 2)
+
+    def test_stats_require_admin_and_valid_dates(self):
+        """Test that non-staff users are refused and bad date ranges rejected"""
+        self.assertEqual(self.client.get(self.url, {"since": "soon"}).status_code, status.HTTP_400_BAD_REQUEST)
+        invalid = {"since": "2026-01-10", "until": "2026-01-01"}
+        self.assertEqual(self.client.get(self.url, invalid).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"since": "2020-01-01"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"until": "0001-01-01"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(self.jane)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
@@ -1,13 +1,167 @@
+from datetime import date, timedelta
+
 from django.contrib.auth import get_user_model
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.viewsets import ReadOnlyModelViewSet
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import BigIntegerField
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
 
-from apps.api.users.serializers import UserSerializer
+from apps.api.users.filters import UserFilter
+from apps.api.users.serializers import (
+    LogEntrySerializer,
+    UserChangeSerializer,
+    UserSerializer,
+    UserSummarySerializer,
+)
+from apps.users.audit_retention import timeline
+from apps.users.changes import changes_since
+from apps.users.exports import DEFAULT_EXPORT_FIELDS, EXPORT_FIELDS, EXPORT_FORMATS, stream_users
+from apps.users.rollups import stats
+from django_project.async_views import AsyncAPIViewMixin, AsyncListModelMixin, AsyncRetrieveModelMixin
 
 User = get_user_model()
 
+# Most users one batch lookup resolves
+BATCH_LIMIT = 100
+# Most changed users (and tombstones) one delta-sync call returns
+CHANGES_LIMIT = 500
+# Audit entries per timeline page
+AUDIT_PAGE_SIZE = 50
+# Days of stats returned by default, and at most
+STATS_DAYS = 30
+STATS_MAX_DAYS = 366
+
 
-class UserViewSet(ReadOnlyModelViewSet):
+class UserViewSet(AsyncAPIViewMixin, AsyncRetrieveModelMixin, AsyncListModelMixin, GenericViewSet):
     permission_classes = [IsAuthenticated]
-    queryset = User.objects.all().order_by("id")
+    # The serializer's groups and user_permissions must not be loaded lazily in an async view
+    queryset = User.objects.prefetch_related("groups", "user_permissions").order_by("id")
     serializer_class = UserSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserFilter
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser], pagination_class=None)
+    async def export(self, request):
+        """
+        Stream every user matching the list filters as CSV or JSONL.
+
+        Query params: `fields` (comma separated), `output` (`csv` or `jsonl`) and `gzip` (`1` to compress).
+        """
+        fields = request.query_params.get("fields")
+        fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else DEFAULT_EXPORT_FIELDS
+        if unknown := [field for field in fields if field not in EXPORT_FIELDS]:
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}"})
+
+        fmt = request.query_params.get("output", "csv")
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Must be one of: {', '.join(EXPORT_FORMATS)}"})
+
+        compress = request.query_params.get("gzip") in ("1", "true")
+        # `values_list()` rows have no relations to prefetch
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        # Under ASGI the rows are streamed from an async iterator
+        asynchronous = isinstance(request._request, ASGIRequest)
+        return stream_users(queryset, fields=fields, fmt=fmt, compress=compress, asynchronous=asynchronous)
+
+    @action(detail=False, methods=["get"], pagination_class=None)
+    async def batch(self, request):
+        """
+        Look up to `BATCH_LIMIT` users at once by `ids` or by `emails` (comma separated), in one query.
+
+        Results follow the order of the request; ids or emails that matched no user are listed in `missing`.
+        Any signed-in user may call it, so users come with `UserSummarySerializer`'s fields only.
+        """
+        ids, emails = request.query_params.get("ids"), request.query_params.get("emails")
+        if bool(ids) == bool(emails):
+            raise ValidationError({"detail": "Pass either `ids` or `emails`."})
+        param = "ids" if ids else "emails"
+        keys = list(dict.fromkeys(key.strip() for key in (ids or emails).split(",") if key.strip()))
+        if len(keys) > BATCH_LIMIT:
+            raise ValidationError({param: f"At most {BATCH_LIMIT} values."})
+
+        # The summary has no groups or permissions to prefetch
+        queryset = self.get_queryset().prefetch_related(None)
+        if ids:
+            try:
+                keys = [int(key) for key in keys]
+            except ValueError as exc:
+                raise ValidationError({"ids": "Must be integers."}) from exc
+            # Ids no primary key can hold would overflow the query; they are missing
+            in_range = [key for key in keys if -BigIntegerField.MAX_BIGINT - 1 <= key <= BigIntegerField.MAX_BIGINT]
+            users = await queryset.ain_bulk(in_range)
+        else:
+            # Emails are unique case-insensitively (ACCOUNT_UNIQUE_EMAIL)
+            keys = list(dict.fromkeys(key.lower() for key in keys))
+            queryset = queryset.annotate(email_lower=Lower("email")).filter(email_lower__in=keys)
+            users = {user.email_lower: user async for user in queryset}
+
+        serializer = UserSummarySerializer([users[key] for key in keys if key in users], many=True)
+        return Response({"results": serializer.data, "missing": [key for key in keys if key not in users]})
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser], pagination_class=None)
+    async def changes(self, request):
+        """
+        Users changed and deleted since `watermark` (omit it to start a full sync), up to `limit` of each.
+
+        Deleted and deactivated users come as `tombstones`. Pass the returned `watermark` to the next
+        call; `more` means further changes are already waiting.
+        """
+        try:
+            limit = int(request.query_params.get("limit", CHANGES_LIMIT))
+        except ValueError as exc:
+            raise ValidationError({"limit": "Must be an integer."}) from exc
+        if not 0 < limit <= CHANGES_LIMIT:
+            raise ValidationError({"limit": f"Must be between 1 and {CHANGES_LIMIT}."})
+
+        try:
+            users, deleted, watermark, more = await changes_since(request.query_params.get("watermark"), limit)
+        except ValueError as exc:
+            raise ValidationError({"watermark": str(exc)}) from exc
+
+        tombstones = [{"id": user.pk, "reason": "deactivated"} for user in users if not user.is_active]
+        tombstones += [{"id": tombstone.user_id, "reason": "deleted"} for tombstone in deleted]
+        serializer = UserChangeSerializer([user for user in users if user.is_active], many=True)
+        return Response({"results": serializer.data, "tombstones": tombstones, "watermark": watermark, "more": more})
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser], pagination_class=None)
+    async def stats(self, request):
+        """
+        User totals (signups, active, staff, verified and unverified emails) and the same stats per signup day.
+
+        Days run from `since` to `until` (YYYY-MM-DD, by default the last `STATS_DAYS` days), at most
+        `STATS_MAX_DAYS` of them; days without signups are left out.
+        """
+        try:
+            until = date.fromisoformat(request.query_params.get("until") or timezone.localdate().isoformat())
+            since = request.query_params.get("since")
+            since = date.fromisoformat(since) if since else until - timedelta(days=STATS_DAYS - 1)
+        # OverflowError: the default `since` would fall before year 1
+        except (ValueError, OverflowError) as exc:
+            raise ValidationError({"detail": "`since` and `until` must be dates (YYYY-MM-DD)."}) from exc
+        if not timedelta(0) <= until - since < timedelta(days=STATS_MAX_DAYS):
+            raise ValidationError({"detail": f"`since` must be on or before `until`, at most {STATS_MAX_DAYS} days."})
+        totals, days = await stats(since, until)
+        return Response({"totals": totals, "since": since, "until": until, "days": days})
+
+    @action(detail=True, methods=["get"], permission_classes=[IsAdminUser], pagination_class=None)
+    async def audit(self, request, pk=None):
+        """
+        The audit log of a user (deleted users included), newest first, `AUDIT_PAGE_SIZE` entries a page.
+
+        Pass the returned `next` as `cursor` for the following page; it is null on the last one.
+        """
+        try:
+            pk = int(pk)
+        except ValueError as exc:
+            raise NotFound from exc
+        try:
+            entries, cursor = await timeline(User, pk, cursor=request.query_params.get("cursor"), limit=AUDIT_PAGE_SIZE)
+        except ValueError as exc:
+            raise ValidationError({"cursor": str(exc)}) from exc
+        return Response({"results": LogEntrySerializer(entries, many=True).data, "next": cursor})
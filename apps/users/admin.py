@@ -1,24 +1,64 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserChangeForm, UserCreationForm
+from django.contrib.auth.models import Group
 
+from apps.users.exports import stream_users
 from apps.users.models import Profile
+from apps.users.search import search
+from django_project.pagination import EstimatedCountPaginator
 
 User = get_user_model()
 
 
+class GroupListFilter(admin.SimpleListFilter):
+    """
+    Filter users by group with a `pk IN (...)` subquery.
+
+    The default filter joins the groups table, which makes the admin add a
+    DISTINCT over every selected column.
+    """
+
+    title = "groups"
+    parameter_name = "groups"
+
+    def lookups(self, request, model_admin):
+        return Group.objects.order_by("name").values_list("pk", "name")
+
+    def queryset(self, request, queryset):
+        if self.value():
+            memberships = User.groups.through.objects.filter(group_id=self.value())
+            return queryset.filter(pk__in=memberships.values("user_id"))
+        return queryset
+
+
+class SearchChangeList(ChangeList):
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        # Best matches first while searching, unless a column was clicked
+        if "search_rank" in queryset.query.annotations and ORDER_VAR not in self.params:
+            return ["-search_rank", *ordering]
+        return ordering
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     form = UserChangeForm
     add_form = UserCreationForm
 
     list_display = ("username", "email", "first_name", "last_name", "is_staff")
-    search_fields = ("username", "email", "first_name", "last_name")
-    list_filter = ("is_staff", "is_active", "groups")
+    # Searches go to the full-text index (see get_search_results); these only enable the search box
+    search_fields = ("^username", "^email", "^first_name", "^last_name")
+    list_filter = ("is_staff", "is_active", GroupListFilter)
+    # Indexed on (created, id)
     ordering = ("-created",)
     list_per_page = 20
     list_display_links = ("username",)
+    # Bounded counts instead of a COUNT(*) of the table on every load
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {"fields": ("username", "email", "password")}),
@@ -35,5 +75,19 @@ class UserAdmin(BaseUserAdmin):
 
     readonly_fields = ("last_login",)
 
+    actions = ["export_csv"]
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search(queryset, search_term), False
+
+    def get_changelist(self, request, **kwargs):
+        return SearchChangeList
+
+    @admin.action(description="Export selected users as CSV")
+    def export_csv(self, request, queryset):
+        return stream_users(queryset)
+
 
 admin.site.register(Profile)
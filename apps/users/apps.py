@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.users"
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+
+        from apps.users import audit, changes, last_login, permission_cache, rollups, search  # noqa: F401 (signal receivers)
+        from apps.users.models import Profile, User
+
+        audit.connect(User, Profile)
+
+        # Replace django.contrib.auth's receiver, which saves the whole user on every login
+        user_logged_in.disconnect(dispatch_uid="update_last_login")
+        user_logged_in.connect(last_login.update_last_login, dispatch_uid="update_last_login")
@@ -0,0 +1,62 @@
+"""
+Audit logging of users and profiles.
+
+Both are registered with django-auditlog from `settings.AUDITLOG_INCLUDE_TRACKING_MODELS`
+with an allowlist of tracked fields, so `password`, `last_login`, `modified` and the
+author fields never end up in a diff.
+
+auditlog's own update receiver loads the stored row (one SELECT per save) to diff
+against. For these models `log_update` replaces it: saves whose `update_fields` hold
+no tracked field are skipped outright, and the diff is taken against the values the
+instance was loaded with (see `TimeStampedModel`) instead of a fresh copy of the row.
+Saves that don't go through the dirty check, e.g. of instances built by hand, still
+fall back to auditlog's receiver.
+
+`_create_log_entry()` and `auditlog._dispatch_uid()` are private to auditlog, which is
+pinned to the releases this was written against (3.3 and 3.4, see pyproject.toml).
+"""
+
+from auditlog import get_logentry_model
+from auditlog.receivers import _create_log_entry, check_disable
+from auditlog.receivers import log_update as auditlog_log_update
+from auditlog.registry import auditlog
+from django.conf import settings
+from django.db.models.signals import pre_save
+
+
+def tracked_fields(model):
+    return set(auditlog.get_model_fields(model)["include_fields"])
+
+
+@check_disable
+def log_update(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or instance.pk is None:
+        return
+    loaded = getattr(instance, "_loaded_values", None)
+    tracked = tracked_fields(sender)
+    if update_fields is not None and not tracked & set(update_fields):
+        return
+    fields = [field for field in sender._meta.concrete_fields if field.primary_key or field.name in tracked]
+    if update_fields is None or loaded is None or any(field.attname not in loaded for field in fields):
+        auditlog_log_update(sender, instance=instance, update_fields=update_fields, **kwargs)
+        return
+
+    # The row as it was loaded, limited to the pk and the tracked fields
+    old = sender.from_db(instance._state.db, [field.attname for field in fields], [loaded[f.attname] for f in fields])
+    _create_log_entry(
+        action=get_logentry_model().Action.UPDATE,
+        instance=instance,
+        sender=sender,
+        diff_old=old,
+        diff_new=instance,
+        fields_to_check=update_fields,
+        use_json_for_changes=settings.AUDITLOG_STORE_JSON_CHANGES,
+    )
+
+
+def connect(*models):
+    """Swap auditlog's update receiver for `log_update` on each registered model in `models`."""
+    for model in models:
+        if auditlog.contains(model):
+            pre_save.disconnect(sender=model, dispatch_uid=auditlog._dispatch_uid(pre_save, auditlog_log_update))
+            pre_save.connect(log_update, sender=model, dispatch_uid="apps.users.audit.log_update")
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from apps.users.permission_cache import get_permissions
+
+UserModel = get_user_model()
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    `ModelBackend` whose permission sets are cached across requests.
+
+    Django only memoises permissions on the user instance, so every request pays the
+    `auth_group_permissions` joins again. Here `has_perm()` is a set lookup once the
+    user's set is cached, see `apps.users.permission_cache`.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            user_obj._perm_cache = get_permissions(user_obj)
+        return user_obj._perm_cache
+
+    def get_user(self, user_id):
+        # The profile comes along for free, e.g. for the profile page's fragment cache key
+        try:
+            user = UserModel._default_manager.select_related("profile").get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,101 @@
+"""
+Coalesced, write-behind updates of `last_login`.
+
+Django's `update_last_login` runs `user.save(update_fields=["last_login"])` on
+every login, and with `TimeStampedModel` and django-author that save also
+rewrites `modified` and `updated_by`: under a login storm, hot accounts queue
+on their row lock. `update_last_login` here replaces it (see `UsersConfig`):
+
+- A login less than `LAST_LOGIN_PRECISION` seconds after the stored
+  `last_login` writes nothing.
+- With `LAST_LOGIN_FLUSH_INTERVAL` at 0, `last_login` alone is written during the
+  login. Otherwise the login only records the time in this process's buffer
+  (repeated logins of a user coalesce) and a background timer writes the whole
+  buffer in one bulk UPDATE at most that many seconds later, and again when the
+  process exits. A process killed outright loses its unwritten timestamps.
+
+Both trade the timeliness of password reset tokens, which hash the stored
+`last_login` so that logging in invalidates them. With both settings at 0 (the
+default) every login does. Otherwise:
+
+- A login within `LAST_LOGIN_PRECISION` leaves the tokens issued before it valid
+  (until they expire).
+- A deferred login only invalidates them once it is written. A token issued
+  between the login and the write hashes the old value, so the write invalidates
+  it too, and the user has to ask for another one.
+"""
+
+import atexit
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from loguru import logger
+
+from django_project.metrics import registry
+
+User = get_user_model()
+
+
+class LastLoginBuffer:
+    """The `{user pk: last login}` times of this process waiting to be written."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = {}
+        self._timer = None
+
+    def add(self, user_pk, when):
+        with self._lock:
+            self.pending[user_pk] = max(when, self.pending.get(user_pk, when))
+            if self._timer is None:
+                self._timer = threading.Timer(settings.LAST_LOGIN_FLUSH_INTERVAL, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write every buffered time in one bulk UPDATE; return how many users were written."""
+        with self._lock:
+            pending, self.pending = self.pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        try:
+            User.objects.bulk_update(
+                [User(pk=pk, last_login=when) for pk, when in pending.items()], ["last_login"], batch_size=500
+            )
+        except DatabaseError as e:
+            logger.warning(f"Writing the last login of {len(pending)} users failed, retrying later: {e}")
+            for pk, when in pending.items():
+                self.add(pk, when)
+            return 0
+        registry.inc("auth_last_login_writes_total", len(pending), mode="deferred")
+        return len(pending)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer's thread has its own connection; don't leave it open
+            connection.close()
+
+
+buffer = LastLoginBuffer()
+atexit.register(buffer.flush)
+
+
+def update_last_login(sender, user, **kwargs):
+    now = timezone.now()
+    previous, user.last_login = user.last_login, now
+    if previous and (now - previous).total_seconds() < settings.LAST_LOGIN_PRECISION:
+        registry.inc("auth_last_login_writes_total", mode="skipped")
+    elif settings.LAST_LOGIN_FLUSH_INTERVAL > 0:
+        buffer.add(user.pk, now)
+    else:
+        # One column: no `modified`/`updated_by` rewrite, audit entry or signals
+        User.objects.filter(pk=user.pk).update(last_login=now)
+        registry.inc("auth_last_login_writes_total", mode="sync")
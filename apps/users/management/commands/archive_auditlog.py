@@ -0,0 +1,48 @@
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.users.audit_retention import archive_entries
+
+
+class Command(BaseCommand):
+    help = "Archive audit log entries older than the retention period to gzipped JSONL, then delete them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.AUDITLOG_RETENTION_DAYS,
+            help="Keep entries younger than this many days (default AUDITLOG_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.AUDITLOG_ARCHIVE_DIR,
+            help="Directory the archive file is written to (default AUDITLOG_ARCHIVE_DIR)",
+        )
+        parser.add_argument("--no-archive", action="store_true", help="Delete the old entries without archiving them")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Entries archived and deleted per transaction")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to wait between batches")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if not options["archive_dir"] and not options["no_archive"]:
+            raise CommandError("Set --archive-dir (or AUDITLOG_ARCHIVE_DIR), or pass --no-archive")
+
+        now = timezone.now()
+        cutoff = now - timedelta(days=options["days"])
+        path = None
+        if not options["no_archive"]:
+            directory = Path(options["archive_dir"])
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"auditlog-{cutoff:%Y%m%d}-{now:%Y%m%dT%H%M%S%f}.jsonl.gz"
+
+        removed = archive_entries(cutoff, archive=path, batch_size=options["batch_size"], pause=options["pause"])
+        if path is not None and not removed:
+            path.unlink()
+        target = f" to {path}" if path is not None and removed else ""
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} entries older than {cutoff:%Y-%m-%d}{target}"))
@@ -0,0 +1,241 @@
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from phonenumber_field.phonenumber import to_python as to_phone_number
+
+from apps.users.models import Profile
+from apps.users.rollups import record_signups
+from apps.users.search import index_users
+
+User = get_user_model()
+
+FIELDS = ("email", "username", "first_name", "last_name", "password", "phone")
+
+
+class Command(BaseCommand):
+    help = "Bulk import users, profiles and email addresses from a CSV or JSONL file (or stdin)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-", help="CSV/JSONL file to import, or '-' for stdin")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "jsonl"),
+            help="Input format. Defaults to the file extension, or csv when reading stdin",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows validated and inserted per batch")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes used to hash passwords (1 hashes in-process)",
+        )
+        parser.add_argument(
+            "--hashed",
+            action="store_true",
+            help="The password column already holds hashes produced by one of PASSWORD_HASHERS",
+        )
+        parser.add_argument("--verified", action="store_true", help="Mark the imported email addresses as verified")
+        parser.add_argument("--dry-run", action="store_true", help="Validate the input without writing anything")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        path = options["path"]
+        fmt = options["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        try:
+            stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e.strerror}") from e
+
+        executor = None
+        if options["workers"] > 1 and not options["hashed"]:
+            executor = ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup)
+
+        imported = skipped = 0
+        # A dry run writes nothing for the database checks to catch in later batches
+        earlier = (set(), set()) if options["dry_run"] else None
+        started = time.perf_counter()
+        try:
+            rows = self.read_rows(stream, fmt)
+            while batch := list(islice(rows, options["batch_size"])):
+                valid, errors = self.validate_batch(batch, hashed=options["hashed"], earlier=earlier)
+                for line, message in errors:
+                    self.stderr.write(f"line {line}: {message}")
+                skipped += len(errors)
+
+                if earlier is not None:
+                    earlier[0].update(data["email"] for data in valid)
+                    earlier[1].update(data["username"].lower() for data in valid)
+                if valid and not options["dry_run"]:
+                    self.create_batch(
+                        valid,
+                        executor=executor,
+                        workers=options["workers"],
+                        hashed=options["hashed"],
+                        verified=options["verified"],
+                    )
+                imported += len(valid)
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{imported} imported, {skipped} skipped ({imported / elapsed:.0f} rows/sec)")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - started
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {imported} users in {elapsed:.2f}s ({imported / elapsed:.0f} rows/sec), skipped {skipped}"
+            )
+        )
+
+    def read_rows(self, stream, fmt):
+        """Yield ``(line_number, row)`` pairs without loading the whole input into memory."""
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                row = {"__error__": f"invalid JSON: {exc.msg}"}
+            if not isinstance(row, dict):
+                row = {"__error__": "expected a JSON object"}
+            yield line_number, row
+
+    def validate_batch(self, batch, hashed=False, earlier=None):
+        """
+        Clean a batch of rows and check them against each other and the database.
+
+        Uniqueness is checked with one query per batch instead of one per row.
+        `earlier` holds the ``(emails, lowercased usernames)`` of rows accepted from
+        earlier batches that were not written, which count as duplicates too.
+        """
+        errors = []
+        cleaned = []
+        seen_emails = set()
+        seen_usernames = set()
+        earlier_emails, earlier_usernames = earlier or ((), ())
+
+        for line, row in batch:
+            if "__error__" in row:
+                errors.append((line, row["__error__"]))
+                continue
+            data = {field: str(row.get(field) or "").strip() for field in FIELDS}
+            data["email"] = data["email"].lower()
+            data["username"] = data["username"] or data["email"].split("@")[0]
+            try:
+                self.clean_row(data, hashed=hashed)
+            except ValidationError as exc:
+                errors.append((line, "; ".join(exc.messages)))
+                continue
+            username = data["username"].lower()
+            if (
+                data["email"] in seen_emails
+                or data["email"] in earlier_emails
+                or username in seen_usernames
+                or username in earlier_usernames
+            ):
+                errors.append((line, "duplicate email or username in input"))
+                continue
+            seen_emails.add(data["email"])
+            seen_usernames.add(username)
+            cleaned.append((line, data))
+
+        existing_emails = set(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=seen_emails)
+            .values_list("email_lower", flat=True)
+        )
+        existing_emails |= set(EmailAddress.objects.filter(email__in=seen_emails).values_list("email", flat=True))
+        existing_usernames = set(
+            User.objects.annotate(username_lower=Lower("username"))
+            .filter(username_lower__in=seen_usernames)
+            .values_list("username_lower", flat=True)
+        )
+
+        valid = []
+        for line, data in cleaned:
+            if data["email"] in existing_emails:
+                errors.append((line, f"a user with email {data['email']} already exists"))
+            elif data["username"].lower() in existing_usernames:
+                errors.append((line, f"a user with username {data['username']} already exists"))
+            else:
+                valid.append(data)
+        errors.sort()
+        return valid, errors
+
+    def clean_row(self, data, hashed=False):
+        if not data["email"]:
+            raise ValidationError("email is required")
+        validate_email(data["email"])
+        User.username_validator(data["username"])
+        for field in ("username", "first_name", "last_name"):
+            max_length = User._meta.get_field(field).max_length
+            if len(data[field]) > max_length:
+                raise ValidationError(f"{field} is longer than {max_length} characters")
+        if hashed and data["password"]:
+            try:
+                identify_hasher(data["password"])
+            except ValueError as exc:
+                raise ValidationError("password is not a recognised hash") from exc
+        if data["phone"]:
+            phone = to_phone_number(data["phone"])
+            if not phone.is_valid():
+                raise ValidationError(f"{data['phone']} is not a valid phone number")
+            data["phone"] = phone
+
+    def create_batch(self, rows, executor=None, workers=1, hashed=False, verified=False):
+        passwords = [row["password"] or None for row in rows]
+        if hashed:
+            # Rows without a password get an unusable one, exactly like create_user(password=None)
+            passwords = [password or make_password(None) for password in passwords]
+        elif executor is not None:
+            chunksize = max(1, len(passwords) // (workers * 4))
+            passwords = list(executor.map(make_password, passwords, chunksize=chunksize))
+        else:
+            passwords = [make_password(password) for password in passwords]
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                User(
+                    username=row["username"],
+                    email=row["email"],
+                    first_name=row["first_name"],
+                    last_name=row["last_name"],
+                    password=password,
+                )
+                for row, password in zip(rows, passwords, strict=True)
+            )
+            Profile.objects.bulk_create(
+                Profile(user=user, phone=row["phone"] or None) for row, user in zip(rows, users, strict=True)
+            )
+            addresses = EmailAddress.objects.bulk_create(
+                EmailAddress(user=user, email=user.email, primary=True, verified=verified) for user in users
+            )
+            # bulk_create() sends no save signals
+            index_users(user.pk for user in users)
+            record_signups(users, addresses)
@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Profile a cold start: settings, per-app import/models/ready(), URLconf, middleware and module imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Modules and packages to list (default 15)")
+        parser.add_argument("--runs", type=int, default=3, help="Cold starts to run; the fastest is reported")
+        parser.add_argument("--json", action="store_true", help="Print the raw timings of the fastest run as JSON")
+
+    def handle(self, *args, **options):
+        runs = [self.cold_start() for _ in range(max(1, options["runs"]))]
+        timings, imports = min(runs, key=lambda run: run[0]["total"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps({**timings, "imports": imports}, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Cold start: {timings['total'] * 1000:.0f} ms"))
+        for name, seconds in timings["phases"].items():
+            self.stdout.write(f"  {name:12}{seconds * 1000:>9.1f} ms")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nApps (ms)"))
+        self.stdout.write(f"  {'app':28}{'import':>9}{'models':>9}{'ready':>9}{'total':>9}")
+        apps = sorted(timings["apps"].values(), key=lambda app: -sum(v for k, v in app.items() if k != "name"))
+        for app in apps:
+            steps = [app.get(step, 0) * 1000 for step in ("import", "models", "ready")]
+            self.stdout.write(f"  {app['name']:28}" + "".join(f"{ms:>9.1f}" for ms in steps) + f"{sum(steps):>9.1f}")
+
+        packages = defaultdict(int)
+        for module, (self_us, _) in imports.items():
+            packages[module.split(".")[0]] += self_us
+        self.stdout.write(self.style.MIGRATE_HEADING("\nImport time by top-level package (ms, self time)"))
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[: options["top"]]:
+            self.stdout.write(f"  {package:40}{self_us / 1000:>9.1f}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSlowest modules (ms, including their imports)"))
+        for module, (_, cumulative_us) in sorted(imports.items(), key=lambda item: -item[1][1])[: options["top"]]:
+            self.stdout.write(f"  {module:60}{cumulative_us / 1000:>9.1f}")
+
+    def cold_start(self):
+        """Return `(timings, {module: (self µs, cumulative µs)})` of a fresh interpreter."""
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "django_project.startup_profile"],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=settings.BASE_DIR,
+        )
+        if result.returncode:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+        imports = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+            imports[module.strip()] = (int(self_us), int(cumulative_us))
+        return json.loads(result.stdout.strip().splitlines()[-1]), imports
@@ -0,0 +1,22 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recount the per-day user rollups (signups, active, staff, verified emails) from the users table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Only recount the days from this date (YYYY-MM-DD) on")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError as e:
+                raise CommandError("--since must be a date (YYYY-MM-DD)") from e
+        days = rebuild(since=since)
+        self.stdout.write(self.style.SUCCESS(f"Recounted {days} days with signups"))
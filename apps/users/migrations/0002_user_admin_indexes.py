@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+# UserAdmin searches these with `^` (istartswith); the expression has to match
+# the backend's istartswith SQL for the index to be used. The model state doesn't
+# know about them, so a SQLite table rebuild (e.g. AlterField) would drop them.
+PREFIX_SEARCH_FIELDS = ("username", "email", "first_name", "last_name")
+
+
+def create_prefix_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for field in PREFIX_SEARCH_FIELDS:
+        name = schema_editor.quote_name(f"users_user_{field}_prefix")
+        column = schema_editor.quote_name(field)
+        if vendor == "postgresql":
+            # istartswith is `UPPER("column"::text) LIKE UPPER('term%')`
+            schema_editor.execute(f"CREATE INDEX {name} ON users_user ((UPPER({column}::text)) text_pattern_ops)")
+        elif vendor == "sqlite":
+            # istartswith is a case-insensitive LIKE, which only a NOCASE index serves
+            schema_editor.execute(f"CREATE INDEX {name} ON users_user ({column} COLLATE NOCASE)")
+
+
+def drop_prefix_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ("postgresql", "sqlite"):
+        for field in PREFIX_SEARCH_FIELDS:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(f'users_user_{field}_prefix')}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created', 'id'], name='users_user_created_id_idx'),
+        ),
+        migrations.RunPython(create_prefix_search_indexes, drop_prefix_search_indexes),
+    ]
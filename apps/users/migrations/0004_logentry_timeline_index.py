@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+# The audit timeline of one object, newest first (see apps.users.audit_retention). It is
+# on auditlog's table, which the model state of this app doesn't include.
+TIMELINE_INDEX = models.Index(fields=["content_type", "object_id", "timestamp", "id"], name="auditlog_timeline_idx")
+
+
+def create_timeline_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model("auditlog", "LogEntry"), TIMELINE_INDEX)
+
+
+def drop_timeline_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model("auditlog", "LogEntry"), TIMELINE_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditlog', '0017_add_actor_email'),
+        ('users', '0003_user_changes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_timeline_index, drop_timeline_index),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:40
+
+from django.db import migrations
+
+# Full-text index of users (see apps.users.search), outside the model state like the
+# prefix indexes of 0002. Filled from the existing users; kept up to date by signals.
+INDEXED_TEXT = """
+    SELECT u.id, u.username, u.email, u.first_name, u.last_name, COALESCE(p.phone, '')
+    FROM users_user u LEFT JOIN users_profile p ON p.user_id = u.id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE TABLE users_user_search (user_id bigint PRIMARY KEY, document tsvector NOT NULL)")
+        schema_editor.execute("CREATE INDEX users_user_search_document ON users_user_search USING GIN (document)")
+        schema_editor.execute(
+            "INSERT INTO users_user_search (user_id, document) SELECT id, "
+            "setweight(to_tsvector('simple', username), 'A') "
+            "|| setweight(to_tsvector('simple', replace(email, '@', ' ')), 'A') "
+            "|| setweight(to_tsvector('simple', first_name || ' ' || last_name), 'B') "
+            "|| setweight(to_tsvector('simple', phone), 'C') "
+            f"FROM ({INDEXED_TEXT}) AS t (id, username, email, first_name, last_name, phone)"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE users_user_fts USING fts5("
+            "username, email, first_name, last_name, phone, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO users_user_fts (rowid, username, email, first_name, last_name, phone) {INDEXED_TEXT}"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS users_user_search")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS users_user_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_logentry_timeline_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:51
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# Most duplicated addresses listed in the error
+LISTED_DUPLICATES = 50
+
+
+def check_case_duplicates(apps, schema_editor):
+    """Stop before adding the unique constraint if addresses that differ only in case are shared."""
+    User = apps.get_model("users", "User")
+    duplicates = (
+        User.objects.exclude(email="")
+        .values(email_lower=Lower("email"))
+        .annotate(users=Count("pk"))
+        .filter(users__gt=1)
+        .order_by("email_lower")
+    )
+    if not duplicates.exists():
+        return
+    listed = []
+    for row in duplicates[:LISTED_DUPLICATES]:
+        pks = User.objects.filter(email__iexact=row["email_lower"]).order_by("pk").values_list("pk", flat=True)
+        listed.append(f"{row['email_lower']} (users {', '.join(map(str, pks))})")
+    raise ValueError(
+        f"{duplicates.count()} email addresses belong to more than one user when case is ignored. "
+        "Merge those users or change their addresses, then migrate again:\n" + "\n".join(listed)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0005_user_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='users_user_email_lower_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='users_user_email_lower_uniq'),
+        ),
+    ]
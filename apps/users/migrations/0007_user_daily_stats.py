@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:06
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    # apps.users.rollups.rebuild() with the historical models
+    User = apps.get_model("users", "User")
+    EmailAddress = apps.get_model("account", "EmailAddress")
+    UserDailyStats = apps.get_model("users", "UserDailyStats")
+    days = {}
+    users = (
+        User.objects.annotate(day=TruncDate("date_joined"))
+        .values("day")
+        .annotate(signups=Count("pk"), active=Count("pk", filter=Q(is_active=True)), staff=Count("pk", filter=Q(is_staff=True)))
+        .order_by()
+    )
+    emails = (
+        EmailAddress.objects.annotate(day=TruncDate("user__date_joined"))
+        .values("day")
+        .annotate(verified_emails=Count("pk", filter=Q(verified=True)), unverified_emails=Count("pk", filter=Q(verified=False)))
+        .order_by()
+    )
+    for row in [*users, *emails]:
+        days.setdefault(row.pop("day"), {}).update(row)
+    UserDailyStats.objects.bulk_create(UserDailyStats(day=day, **stats) for day, stats in days.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('account', '0009_emailaddress_unique_primary_email'),
+        ('users', '0006_user_email_lower'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('signups', models.IntegerField(default=0)),
+                ('active', models.IntegerField(default=0)),
+                ('staff', models.IntegerField(default=0)),
+                ('verified_emails', models.IntegerField(default=0)),
+                ('unverified_emails', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'user daily stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined'], name='users_user_date_joined_idx'),
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
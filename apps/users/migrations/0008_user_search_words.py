@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:20
+
+from django.db import migrations
+
+# Rebuild the PostgreSQL search documents with each field split at punctuation, as
+# apps.users.search now builds them. SQLite's FTS5 tokenizer already splits there.
+WORDS = "regexp_replace({}, '[[:punct:][:space:]]+', ' ', 'g')"
+REINDEX = f"""
+    UPDATE users_user_search s SET document =
+        setweight(to_tsvector('simple', {WORDS.format("u.username")}), 'A')
+        || setweight(to_tsvector('simple', {WORDS.format("u.email")}), 'A')
+        || setweight(to_tsvector('simple', {WORDS.format("u.first_name || ' ' || u.last_name")}), 'B')
+        || setweight(to_tsvector('simple', {WORDS.format("COALESCE(p.phone, '')")}), 'C')
+    FROM users_user u LEFT JOIN users_profile p ON p.user_id = u.id
+    WHERE u.id = s.user_id
+"""
+
+
+def reindex_search_words(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(REINDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_daily_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_search_words, migrations.RunPython.noop),
+    ]
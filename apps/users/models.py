@@ -1,16 +1,119 @@
 from author.decorators import with_author
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django_extensions.db.models import TimeStampedModel
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+from django.utils import timezone
+from django_extensions.db.models import TimeStampedModel as BaseTimeStampedModel
 from phonenumber_field.modelfields import PhoneNumberField
 
 
+class TimeStampedModel(BaseTimeStampedModel):
+    """
+    `TimeStampedModel` that saves only what changed.
+
+    Instances remember the field values they were loaded with. `save()` without
+    `update_fields` on a loaded instance writes just the changed columns, and
+    skips the database (and with it the save signals: audit log, author, cache
+    invalidation) entirely when nothing changed. New instances, deleted instances
+    saved again, `force_insert` saves and instances built by hand with a pk are
+    saved whole.
+
+    `modified` (and `updated_by`, set by django-author) are added to any
+    `update_fields`: the upstream model only sets `modified` in memory then, so
+    partial saves (e.g. allauth changing an email) would leave it stale for
+    cache keys built from it.
+    """
+
+    class Meta(BaseTimeStampedModel.Meta):
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._current_values()
+        return instance
+
+    def _current_values(self, fields=None):
+        """`{attname: value}` of the concrete fields (or just `fields`) that are loaded."""
+        concrete = self._meta.concrete_fields if fields is None else [self._meta.get_field(name) for name in fields]
+        return {field.attname: getattr(self, field.attname) for field in concrete if field.attname in self.__dict__}
+
+    def get_dirty_fields(self):
+        """Names of the fields changed since the instance was loaded or last saved."""
+        loaded = getattr(self, "_loaded_values", {})
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != getattr(self, field.attname))
+        }
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._loaded_values = {**getattr(self, "_loaded_values", {}), **self._current_values(fields)}
+
+    def save(self, **kwargs):
+        # Inserts (new instances, deleted ones saved again, force_insert) are saved whole
+        inserting = self._state.adding or self.pk is None or kwargs.get("force_insert")
+        if hasattr(self, "_loaded_values") and not inserting and kwargs.get("update_fields") is None:
+            if not (dirty := self.get_dirty_fields()):
+                return
+            kwargs["update_fields"] = dirty
+        update_fields = kwargs.get("update_fields")
+        if update_fields and kwargs.get("update_modified", getattr(self, "update_modified", True)):
+            edit_fields = {"modified", "updated_by"} & {field.name for field in self._meta.concrete_fields}
+            kwargs["update_fields"] = update_fields = {*update_fields, *edit_fields}
+        super().save(**kwargs)
+        if update_fields is None:
+            self._loaded_values = self._current_values()
+        else:
+            # Only the saved columns are stored now; the other changes are still unsaved
+            self._loaded_values = {**getattr(self, "_loaded_values", {}), **self._current_values(update_fields)}
+
+
+class LowerExact(Exact):
+    """`exact` compared lowercased, `LOWER(column) = LOWER(value)`, as `Lower()` expression indexes are built."""
+
+    def process_lhs(self, compiler, connection, lhs=None):
+        sql, params = super().process_lhs(compiler, connection, lhs)
+        return f"LOWER({sql})", params
+
+    def process_rhs(self, compiler, connection):
+        sql, params = super().process_rhs(compiler, connection)
+        return f"LOWER({sql})", params
+
+
 @with_author
 class User(AbstractUser, TimeStampedModel):
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # ACCOUNT_UNIQUE_EMAIL, case-insensitively; users without an email are exempt
+            models.UniqueConstraint(Lower("email"), condition=~Q(email=""), name="users_user_email_lower_uniq"),
+        ]
+        indexes = [
+            # Email lookups (`email=`, see below, and `Lower("email")`): the partial unique index above only
+            # serves queries that repeat its condition
+            models.Index(Lower("email"), name="users_user_email_lower_idx"),
+            # The admin changelist's `-created` ordering (with `-pk` as the tiebreaker)
+            models.Index(fields=["created", "id"], name="users_user_created_id_idx"),
+            # Keyset pagination of the delta-sync feed (see apps.users.changes)
+            models.Index(fields=["modified", "id"], name="users_user_modified_id_idx"),
+            # Recounting the users who signed up on given days (see apps.users.rollups)
+            models.Index(fields=["date_joined"], name="users_user_date_joined_idx"),
+        ]
+
     def __str__(self):
         return f"{self.username} - {self.email}"
 
 
+# Emails are matched case-insensitively: allauth looks users up with `email=<lowercased address>`
+# on login, registration and password reset, which this serves from the `Lower("email")` index
+User._meta.get_field("email").register_lookup(LowerExact, "exact")
+
+
 @with_author
 class Profile(TimeStampedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
@@ -18,3 +121,37 @@ class Profile(TimeStampedModel):
 
     def __str__(self):
         return f"{self.user.username} {self.user.email}"
+
+
+class UserTombstone(models.Model):
+    """A deleted user, kept so delta-sync consumers learn about the deletion."""
+
+    user_id = models.BigIntegerField()
+    deleted = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["deleted", "id"], name="users_tombstone_deleted_id_idx")]
+
+    def __str__(self):
+        return f"User {self.user_id} deleted {self.deleted:%Y-%m-%d %H:%M}"
+
+
+class UserDailyStats(models.Model):
+    """
+    Counts of the users who signed up on `day`, kept up to date by apps.users.rollups.
+
+    `active`, `staff` and the email counts describe those users as they are now.
+    """
+
+    day = models.DateField(unique=True)
+    signups = models.IntegerField(default=0)
+    active = models.IntegerField(default=0)
+    staff = models.IntegerField(default=0)
+    verified_emails = models.IntegerField(default=0)
+    unverified_emails = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "user daily stats"
+
+    def __str__(self):
+        return f"{self.day}: {self.signups} signups"
@@ -0,0 +1,105 @@
+"""
+A cross-request cache of each user's permission set.
+
+A user's effective permission set is resolved from the database (their own and their
+groups' permissions) and cached in `settings.PERMISSION_CACHE` under a key that
+includes a global version. Changes to a single user's groups or permissions drop that
+user's entry; changes that can affect many users (group permissions, renamed or deleted
+groups, deleted permissions) bump the version instead.
+
+Invalidation only reaches the processes sharing that cache. With a per-process cache
+(Django's default `LocMemCache`) another worker keeps serving a revoked permission
+until its entry expires, so `PERMISSION_CACHE_TIMEOUT` defaults to a few seconds; point
+`PERMISSION_CACHE` at a shared cache (e.g. Redis) before raising it.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from django_project.metrics import registry
+
+User = get_user_model()
+
+VERSION_KEY = "perms:version"
+
+
+def permission_cache():
+    return caches[settings.PERMISSION_CACHE]
+
+
+def _cache_key(user):
+    version = permission_cache().get_or_set(VERSION_KEY, time.time_ns(), timeout=None)
+    return f"perms:{version}:{user.pk}:{int(user.is_superuser)}"
+
+
+def compute_permissions(user):
+    """Resolve the permission strings of `user` (direct and through groups) from the database, in one query."""
+    perms = Permission.objects.all()
+    if not user.is_superuser:
+        perms = perms.filter(Q(user=user) | Q(group__user=user))
+    return {
+        f"{app}.{codename}"
+        for app, codename in perms.values_list("content_type__app_label", "codename").order_by().distinct()
+    }
+
+
+def get_permissions(user):
+    cache = permission_cache()
+    key = _cache_key(user)
+    perms = cache.get(key)
+    registry.inc("django_cache_lookups_total", cache="permissions", result="miss" if perms is None else "hit")
+    if perms is None:
+        perms = frozenset(compute_permissions(user))
+        cache.set(key, perms, timeout=settings.PERMISSION_CACHE_TIMEOUT)
+    return perms
+
+
+def invalidate_user(user_pk):
+    cache = permission_cache()
+    version = cache.get(VERSION_KEY)
+    if version is not None:
+        cache.delete_many([f"perms:{version}:{user_pk}:0", f"perms:{version}:{user_pk}:1"])
+
+
+def invalidate_all():
+    permission_cache().set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_user(instance.pk)
+    elif pk_set:
+        # Changed from the group/permission side: `pk_set` holds the affected users
+        for pk in pk_set:
+            invalidate_user(pk)
+    else:
+        invalidate_all()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate_all()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def groups_or_permissions_changed(sender, **kwargs):
+    invalidate_all()
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
@@ -0,0 +1,202 @@
+"""
+Per-day rollups of users for dashboards: signups, and how many of those users are
+active, staff, and have verified or unverified email addresses.
+
+Each `UserDailyStats` row counts the users who signed up that day (in TIME_ZONE),
+so totals are a sum over days and any stat is O(days), not O(users). Save and
+delete signals of users and email addresses apply each change as an atomic
+increment of the affected day's row. Changes the signals can't see as a delta (a
+user saved without loaded values, a changed `date_joined`) recount their days from
+the users table instead. Writes that bypass the signals (`bulk_create`,
+`QuerySet.update()`) must call `record_signups()` or `rebuild()` themselves;
+`manage.py rollup_users` rebuilds everything.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.users.models import UserDailyStats
+
+User = get_user_model()
+
+STATS = ("signups", "active", "staff", "verified_emails", "unverified_emails")
+# User fields the rollups count
+USER_FIELDS = ("is_active", "is_staff", "date_joined")
+
+
+def day_of(joined):
+    return timezone.localdate(joined)
+
+
+def day_range(day):
+    """`(start, end)` datetimes of `day` in the current time zone."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def add(day, **deltas):
+    """Add `deltas` (`{stat: change}`) to the stats of `day`, atomically."""
+    deltas = {stat: delta for stat, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    increments = {stat: F(stat) + delta for stat, delta in deltas.items()}
+    if UserDailyStats.objects.filter(day=day).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            UserDailyStats.objects.create(day=day, **deltas)
+    except IntegrityError:
+        # Created concurrently
+        UserDailyStats.objects.filter(day=day).update(**increments)
+
+
+def email_stat(verified):
+    return "verified_emails" if verified else "unverified_emails"
+
+
+def record_signups(users, email_addresses=()):
+    """Count new users and their email addresses created without signals (e.g. by `bulk_create()`)."""
+    deltas = defaultdict(Counter)
+    joined = {}
+    for user in users:
+        joined[user.pk] = day = day_of(user.date_joined)
+        deltas[day].update(signups=1, active=int(user.is_active), staff=int(user.is_staff))
+    for address in email_addresses:
+        deltas[joined[address.user_id]][email_stat(address.verified)] += 1
+    for day, counts in deltas.items():
+        add(day, **counts)
+
+
+def count_days(users, email_addresses):
+    """`{day: {stat: count}}` of the users in `users` and the addresses in `email_addresses`."""
+    days = defaultdict(lambda: dict.fromkeys(STATS, 0))
+    rows = (
+        users.annotate(day=TruncDate("date_joined"))
+        .values("day")
+        .annotate(
+            signups=Count("pk"),
+            active=Count("pk", filter=Q(is_active=True)),
+            staff=Count("pk", filter=Q(is_staff=True)),
+        )
+        .order_by()
+    )
+    for row in rows:
+        days[row.pop("day")].update(row)
+    rows = (
+        email_addresses.annotate(day=TruncDate("user__date_joined"))
+        .values("day")
+        .annotate(
+            verified_emails=Count("pk", filter=Q(verified=True)),
+            unverified_emails=Count("pk", filter=Q(verified=False)),
+        )
+        .order_by()
+    )
+    for row in rows:
+        days[row.pop("day")].update(row)
+    return days
+
+
+def rebuild(since=None, days=None):
+    """
+    Recount the stats of every day, of the days from `since` on, or of the given
+    `days`, from the users table. Returns the number of days with signups.
+    """
+    if days is not None:
+        days = set(days)
+        if not days:
+            return 0
+        joined = Q()
+        for day in days:
+            start, end = day_range(day)
+            joined |= Q(date_joined__gte=start, date_joined__lt=end)
+        stale = UserDailyStats.objects.filter(day__in=days)
+    elif since is not None:
+        joined = Q(date_joined__gte=day_range(since)[0])
+        stale = UserDailyStats.objects.filter(day__gte=since)
+    else:
+        joined, stale = Q(), UserDailyStats.objects.all()
+
+    users = User.objects.filter(joined)
+    counted = count_days(users, EmailAddress.objects.filter(user__in=users) if joined else EmailAddress.objects.all())
+    with transaction.atomic():
+        stale.delete()
+        UserDailyStats.objects.bulk_create(UserDailyStats(day=day, **stats) for day, stats in counted.items())
+    return len(counted)
+
+
+async def stats(since, until):
+    """Return `(totals, days)`: every stat summed over all days, and the stats of each day from `since` to `until`."""
+    totals = await UserDailyStats.objects.aaggregate(**{stat: Sum(stat) for stat in STATS})
+    days = UserDailyStats.objects.filter(day__gte=since, day__lte=until).order_by("day").values("day", *STATS)
+    return {stat: value or 0 for stat, value in totals.items()}, [day async for day in days]
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        add(day_of(instance.date_joined), signups=1, active=int(instance.is_active), staff=int(instance.is_staff))
+        return
+    if update_fields is not None and not set(update_fields) & set(USER_FIELDS):
+        return
+    loaded = getattr(instance, "_loaded_values", None)
+    if loaded is None or any(field not in loaded for field in USER_FIELDS):
+        rebuild(days=[day_of(instance.date_joined)])
+        return
+    day, old_day = day_of(instance.date_joined), day_of(loaded["date_joined"])
+    if day != old_day:
+        rebuild(days=[old_day, day])
+        return
+    add(
+        day,
+        active=int(instance.is_active) - int(loaded["is_active"]),
+        staff=int(instance.is_staff) - int(loaded["is_staff"]),
+    )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # As stored: the instance may have been changed in memory since it was loaded
+    values = {**{field: getattr(instance, field) for field in USER_FIELDS}, **getattr(instance, "_loaded_values", {})}
+    add(day_of(values["date_joined"]), signups=-1, active=-int(values["is_active"]), staff=-int(values["is_staff"]))
+
+
+def _address_state(address):
+    """What of an email address the rollups count: `(user id, verified)`."""
+    return address.__dict__.get("user_id"), address.__dict__.get("verified")
+
+
+def _add_address(user_id, verified, delta):
+    joined = User.objects.filter(pk=user_id).values_list("date_joined", flat=True).first()
+    if joined is not None:
+        add(day_of(joined), **{email_stat(verified): delta})
+
+
+@receiver(post_init, sender=EmailAddress)
+def email_address_loaded(sender, instance, **kwargs):
+    instance._rollup_state = _address_state(instance)
+
+
+@receiver(post_save, sender=EmailAddress)
+def email_address_saved(sender, instance, created, **kwargs):
+    old, new = getattr(instance, "_rollup_state", (None, None)), _address_state(instance)
+    if created:
+        _add_address(*new, 1)
+    elif old != new and old[0] is not None:
+        _add_address(*old, -1)
+        _add_address(*new, 1)
+    instance._rollup_state = new
+
+
+@receiver(post_delete, sender=EmailAddress)
+def email_address_deleted(sender, instance, **kwargs):
+    # Deleted along with its user: the user's row is deleted after its addresses
+    _add_address(*getattr(instance, "_rollup_state", _address_state(instance)), -1)
@@ -0,0 +1,151 @@
+"""
+Ranked full-text search over users: username, email, first and last name, and
+profile phone number.
+
+The index is a table of its own, created by migration 0005: an FTS5 virtual table
+(`users_user_fts`, rowid = user id) on SQLite, a table of `tsvector` documents
+with a GIN index (`users_user_search`) on PostgreSQL. Saving or deleting a user
+or a profile re-indexes that user, with the indexed text selected straight from
+the user and profile tables. Writes that bypass the save signals (`bulk_create`,
+`QuerySet.update()`) must call `index_users()` themselves.
+
+Every word of a search is matched as a prefix of some indexed word, and results
+are ranked best first in `search_rank`. On other databases `search()` falls back
+to case-insensitive prefix matching, unranked.
+"""
+
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.models import Profile
+
+User = get_user_model()
+
+SEARCH_FIELDS = ("username", "email", "first_name", "last_name")
+FTS_TABLE = "users_user_fts"
+TSVECTOR_TABLE = "users_user_search"
+# username, email, first_name, last_name, phone
+FTS_WEIGHTS = (10.0, 10.0, 5.0, 5.0, 2.0)
+
+# The indexed text of users: `{where}` restricts it to some of them
+INDEXED_TEXT = """
+    SELECT u.id, u.username, u.email, u.first_name, u.last_name, COALESCE(p.phone, '')
+    FROM users_user u LEFT JOIN users_profile p ON p.user_id = u.id {where}
+"""
+# Each field split at punctuation, as `search_terms()` splits a search: PostgreSQL's parser
+# would keep `example.com` as one host and `+256...` as one signed number
+WORDS = "regexp_replace({}, '[[:punct:][:space:]]+', ' ', 'g')"
+TSVECTOR = f"""
+    setweight(to_tsvector('simple', {WORDS.format("username")}), 'A')
+    || setweight(to_tsvector('simple', {WORDS.format("email")}), 'A')
+    || setweight(to_tsvector('simple', {WORDS.format("first_name || ' ' || last_name")}), 'B')
+    || setweight(to_tsvector('simple', {WORDS.format("phone")}), 'C')
+"""
+
+
+def backend():
+    """`"fts5"`, `"tsvector"` or None (no full-text index) for the default database."""
+    return {"sqlite": "fts5", "postgresql": "tsvector"}.get(connection.vendor)
+
+
+def index_users(pks=None):
+    """(Re-)index the users with these pks, or every user."""
+    kind = backend()
+    if kind is None:
+        return
+    if pks is not None:
+        pks = list(pks)
+        if not pks:
+            return
+    where, params = ("WHERE u.id IN ({})".format(", ".join(["%s"] * len(pks))), pks) if pks is not None else ("", [])
+    selected = INDEXED_TEXT.format(where=where)
+    with connection.cursor() as cursor:
+        if kind == "fts5":
+            if pks is None:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            else:
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(pks))})", pks)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, username, email, first_name, last_name, phone) {selected}", params
+            )
+        else:
+            cursor.execute(
+                f"INSERT INTO {TSVECTOR_TABLE} (user_id, document) "
+                f"SELECT id, {TSVECTOR} FROM ({selected}) AS t (id, username, email, first_name, last_name, phone) "
+                "ON CONFLICT (user_id) DO UPDATE SET document = EXCLUDED.document",
+                params,
+            )
+
+
+def unindex_user(pk):
+    kind = backend()
+    if kind is not None:
+        table, column = (FTS_TABLE, "rowid") if kind == "fts5" else (TSVECTOR_TABLE, "user_id")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE {column} = %s", [pk])
+
+
+def search_terms(text):
+    """The lowercased words of a search, as the indexes split them: runs of letters and digits."""
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def search(queryset, text):
+    """`queryset` (of users) narrowed to the users matching `text`, best first, ranked in `search_rank`."""
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    kind = backend()
+    pk = f"{connection.ops.quote_name(User._meta.db_table)}.{connection.ops.quote_name('id')}"
+    if kind == "fts5":
+        match = " ".join(f'"{term}"*' for term in terms)
+        matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        # bm25() is lower for better matches
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {pk}",
+            (match,),
+            output_field=FloatField(),
+        )
+    elif kind == "tsvector":
+        query = " & ".join(f"{term}:*" for term in terms)
+        matches = RawSQL(f"SELECT user_id FROM {TSVECTOR_TABLE} WHERE document @@ to_tsquery('simple', %s)", (query,))
+        rank = RawSQL(
+            f"SELECT ts_rank(document, to_tsquery('simple', %s)) FROM {TSVECTOR_TABLE} WHERE user_id = {pk}",
+            (query,),
+            output_field=FloatField(),
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= Q(*[Q(**{f"{field}__istartswith": term}) for field in SEARCH_FIELDS], _connector=Q.OR)
+        return queryset.filter(condition).annotate(search_rank=Value(0.0)).order_by("pk")
+    return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by(F("search_rank").desc(), "pk")
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or not set(update_fields).isdisjoint(SEARCH_FIELDS):
+        index_users([instance.pk])
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "phone" in update_fields:
+        index_users([instance.user_id])
+
+
+@receiver(post_delete, sender=Profile)
+def profile_deleted(sender, instance, **kwargs):
+    index_users([instance.user_id])
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    unindex_user(instance.pk)
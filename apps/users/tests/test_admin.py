@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from django_project.pagination import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class UserAdminTests(TestCase):
+    """Test cases for the UserAdmin changelist"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="secret")
+        cls.jane = User.objects.create_user(username="jane", email="jane@example.com", first_name="Jane")
+        cls.john = User.objects.create_user(username="john", email="john@example.com", first_name="John")
+        staff, support = Group.objects.create(name="staff"), Group.objects.create(name="support")
+        cls.jane.groups.add(staff, support)
+        cls.john.groups.add(support)
+        cls.staff = staff
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:users_user_changelist")
+
+    def results(self, response):
+        return sorted(user.username for user in response.context["cl"].result_list)
+
+    def test_search_by_prefix(self):
+        """Test that search matches the start of indexed words, case-insensitively"""
+        self.assertEqual(self.results(self.client.get(self.url, {"q": "JA"})), ["jane"])
+        self.assertEqual(self.results(self.client.get(self.url, {"q": "john example"})), ["john"])
+        self.assertEqual(self.results(self.client.get(self.url, {"q": "xample"})), [])
+
+    def test_search_is_ranked(self):
+        """Test that search results come best match first"""
+        User.objects.create_user(username="other", email="other@example.com", first_name="Jo")
+        response = self.client.get(self.url, {"q": "jo"})
+        self.assertEqual([user.username for user in response.context["cl"].result_list][-1], "other")
+
+    def test_group_filter(self):
+        """Test that the group filter returns each member once, without DISTINCT"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"groups": self.staff.pk})
+        self.assertEqual(self.results(response), ["jane"])
+        self.assertFalse(any("DISTINCT" in query["sql"] for query in queries.captured_queries))
+
+    @override_settings(ADMIN_COUNT_LIMIT=2)
+    def test_count_is_capped(self):
+        """Test that counts stop at ADMIN_COUNT_LIMIT"""
+        self.assertEqual(EstimatedCountPaginator(User.objects.order_by("pk"), 20).count, 2)
+        self.assertEqual(self.client.get(self.url).context["cl"].result_count, 2)
+
+    def test_prefix_search_uses_an_index(self):
+        """Test that the database serves prefix searches from an index"""
+        if connection.vendor != "sqlite":
+            self.skipTest("Query plan checked on SQLite only")
+        sql, params = User.objects.filter(username__istartswith="ja").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn("users_user_username_prefix", plan)
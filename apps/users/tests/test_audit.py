@@ -0,0 +1,72 @@
+from asgiref.sync import async_to_sync
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.users.audit_retention import timeline
+from apps.users.models import Profile
+
+User = get_user_model()
+
+
+class AuditLogTests(TestCase):
+    """Test cases for the field-scoped audit log of users and profiles"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="jane", email="jane@example.com", password="testpass123")
+        self.user = User.objects.get(pk=self.user.pk)
+
+    def entries(self, instance):
+        return list(LogEntry.objects.get_for_object(instance).order_by("pk"))
+
+    def test_create_logs_tracked_fields_only(self):
+        """Test that the creation entry has no password, timestamps or author fields"""
+        (entry,) = self.entries(self.user)
+        self.assertEqual(entry.action, LogEntry.Action.CREATE)
+        self.assertIn("email", entry.changes_dict)
+        for field in ("password", "last_login", "modified", "updated_by"):
+            self.assertNotIn(field, entry.changes_dict)
+
+    def test_update_is_diffed_without_reloading_the_row(self):
+        """Test that an update logs the changed field, diffed against the loaded values"""
+        self.user.first_name = "Jane"
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+        self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith('SELECT "users_user"')])
+        entry = self.entries(self.user)[-1]
+        self.assertEqual(entry.action, LogEntry.Action.UPDATE)
+        self.assertEqual(entry.changes_dict, {"first_name": ["", "Jane"]})
+
+    def test_untracked_changes_are_not_logged(self):
+        """Test that password and last_login changes leave no audit entry"""
+        self.user.set_password("newpass123")
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(len(self.entries(self.user)), 1)
+
+    def test_profile_phone_is_logged(self):
+        """Test that phone changes of a profile are logged"""
+        profile = Profile.objects.create(user=self.user, phone="+256781435857")
+        profile = Profile.objects.get(pk=profile.pk)
+        profile.phone = "+256781435858"
+        profile.save()
+        entry = self.entries(profile)[-1]
+        self.assertEqual(entry.changes_dict, {"phone": ["+256781435857", "+256781435858"]})
+
+    def test_timeline_pages_newest_first(self):
+        """Test that the timeline walks one object's entries newest first, without repeats"""
+        for name in ("A", "B", "C"):
+            self.user.first_name = name
+            self.user.save()
+        User.objects.create_user(username="other", email="other@example.com")
+
+        seen, cursor = [], None
+        while True:
+            entries, cursor = async_to_sync(timeline)(User, self.user.pk, cursor=cursor, limit=2)
+            seen += entries
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.entries(self.user)[::-1])
+        self.assertEqual(len(seen), 4)
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+
+from apps.users.permission_cache import VERSION_KEY
+
+User = get_user_model()
+
+
+class CachedModelBackendTests(TestCase):
+    """Test cases for CachedModelBackend permission caching"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.group = Group.objects.create(name="support")
+        self.perm = Permission.objects.get(codename="view_user")
+
+    def fresh_user(self):
+        # A new instance per "request", so Django's per-instance memoisation doesn't hide queries
+        return User.objects.get(pk=self.user.pk)
+
+    def test_group_permission_is_cached_across_instances(self):
+        """Test that a second request resolves permissions without queries"""
+        self.group.permissions.add(self.perm)
+        self.user.groups.add(self.group)
+        self.assertTrue(self.fresh_user().has_perm("users.view_user"))
+
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("users.view_user"))
+            self.assertFalse(user.has_perm("users.delete_user"))
+
+    def test_adding_user_to_group_invalidates_cache(self):
+        """Test that joining a group is picked up immediately"""
+        self.group.permissions.add(self.perm)
+        self.assertFalse(self.fresh_user().has_perm("users.view_user"))
+
+        self.user.groups.add(self.group)
+        self.assertTrue(self.fresh_user().has_perm("users.view_user"))
+
+    def test_changing_group_permissions_invalidates_cache(self):
+        """Test that granting and revoking a group permission is picked up immediately"""
+        self.user.groups.add(self.group)
+        self.assertFalse(self.fresh_user().has_perm("users.view_user"))
+
+        self.group.permissions.add(self.perm)
+        self.assertTrue(self.fresh_user().has_perm("users.view_user"))
+
+        self.group.permissions.remove(self.perm)
+        self.assertFalse(self.fresh_user().has_perm("users.view_user"))
+
+    def test_user_permissions_invalidate_cache(self):
+        """Test that direct user permissions are picked up immediately"""
+        self.assertFalse(self.fresh_user().has_perm("users.view_user"))
+        self.user.user_permissions.add(self.perm)
+        self.assertTrue(self.fresh_user().has_perm("users.view_user"))
+
+    def test_group_permissions_come_from_the_database(self):
+        """Test that a group declared in GROUP_PERMISSIONS resolves to its permissions as edited in the admin"""
+        group = Group.objects.get(name="cs_admin")
+        self.user.groups.add(group)
+        self.assertTrue(self.fresh_user().has_perm("auth.group_view"))
+
+        group.permissions.remove(Permission.objects.get(content_type__app_label="auth", codename="group_view"))
+        self.assertFalse(self.fresh_user().has_perm("auth.group_view"))
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "permissions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "permissions"},
+        },
+        PERMISSION_CACHE="permissions",
+    )
+    def test_sets_are_kept_in_the_permission_cache(self):
+        """Test that permission sets and their invalidation use the PERMISSION_CACHE alias"""
+        self.user.user_permissions.add(self.perm)
+        self.assertTrue(self.fresh_user().has_perm("users.view_user"))
+        version = caches["permissions"].get(VERSION_KEY)
+        self.assertEqual(caches["permissions"].get(f"perms:{version}:{self.user.pk}:0"), {"users.view_user"})
+
+        self.user.user_permissions.remove(self.perm)
+        self.assertFalse(self.fresh_user().has_perm("users.view_user"))
+
+    def test_inactive_user_has_no_permissions(self):
+        """Test that inactive users get no permissions even when cached"""
+        self.user.user_permissions.add(self.perm)
+        self.assertTrue(self.fresh_user().has_perm("users.view_user"))
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.fresh_user().has_perm("users.view_user"))
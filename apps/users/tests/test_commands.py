@@ -0,0 +1,198 @@
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from allauth.account.models import EmailAddress
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.users.models import Profile, UserDailyStats
+
+User = get_user_model()
+
+
+class ImportUsersCommandTests(TestCase):
+    """Test cases for the import_users management command"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmpdir.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def import_users(self, path, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_users", path, "--workers=1", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv_creates_user_profile_and_email(self):
+        """Test that a CSV row creates a User, Profile and EmailAddress"""
+        path = self.write(
+            "users.csv",
+            "email,username,first_name,last_name,password,phone\n"
+            "Jane@Example.com,jane,Jane,Doe,secret123,+256781435857\n",
+        )
+        stdout, stderr = self.import_users(path)
+
+        self.assertIn("Imported 1 users", stdout)
+        self.assertEqual(stderr, "")
+        user = User.objects.get(username="jane")
+        self.assertEqual(user.email, "jane@example.com")
+        self.assertTrue(user.check_password("secret123"))
+        self.assertEqual(str(Profile.objects.get(user=user).phone), "+256781435857")
+        email = EmailAddress.objects.get(user=user)
+        self.assertTrue(email.primary)
+        self.assertFalse(email.verified)
+        stats = UserDailyStats.objects.get(day=timezone.localdate(user.date_joined))
+        self.assertEqual((stats.signups, stats.active, stats.unverified_emails), (1, 1, 1))
+
+    def test_import_jsonl_with_small_batches(self):
+        """Test that JSONL input is imported across several batches"""
+        lines = [json.dumps({"email": f"user{i}@example.com"}) for i in range(5)]
+        path = self.write("users.jsonl", "\n".join(lines) + "\n")
+        stdout, _ = self.import_users(path, "--batch-size=2", "--verified")
+
+        self.assertIn("Imported 5 users", stdout)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(EmailAddress.objects.filter(verified=True).count(), 5)
+        # Username defaults to the local part of the email
+        self.assertTrue(User.objects.filter(username="user3").exists())
+        # No password given means an unusable one
+        self.assertFalse(User.objects.get(username="user0").has_usable_password())
+
+    def test_import_skips_invalid_and_duplicate_rows(self):
+        """Test that invalid rows and duplicates are reported and skipped"""
+        User.objects.create_user(username="taken", email="taken@example.com")
+        lines = [
+            json.dumps({"email": "ok@example.com"}),
+            json.dumps({"email": "not-an-email"}),
+            json.dumps({"email": "TAKEN@example.com", "username": "other"}),
+            json.dumps({"email": "ok@example.com", "username": "again"}),
+            "{broken",
+        ]
+        path = self.write("users.jsonl", "\n".join(lines))
+        stdout, stderr = self.import_users(path)
+
+        self.assertIn("Imported 1 users", stdout)
+        self.assertIn("skipped 4", stdout)
+        self.assertIn("line 2:", stderr)
+        self.assertIn("line 3: a user with email taken@example.com already exists", stderr)
+        self.assertIn("line 4: duplicate email or username in input", stderr)
+        self.assertIn("line 5: invalid JSON", stderr)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_import_pre_hashed_passwords(self):
+        """Test that --hashed stores password hashes as given"""
+        hashed = make_password("secret123")
+        path = self.write("users.csv", f"email,password\njane@example.com,{hashed}\nbob@example.com,plaintext\n")
+        stdout, stderr = self.import_users(path, "--hashed")
+
+        self.assertIn("Imported 1 users", stdout)
+        self.assertIn("line 3: password is not a recognised hash", stderr)
+        self.assertEqual(User.objects.get(email="jane@example.com").password, hashed)
+
+    def test_dry_run_writes_nothing(self):
+        """Test that --dry-run validates without creating users"""
+        path = self.write("users.csv", "email\njane@example.com\n")
+        stdout, _ = self.import_users(path, "--dry-run")
+
+        self.assertIn("Validated 1 users", stdout)
+        self.assertFalse(User.objects.exists())
+
+    def test_dry_run_finds_duplicates_across_batches(self):
+        """Test that --dry-run reports rows repeating an earlier batch, as the real import would"""
+        path = self.write(
+            "users.csv", "email,username\njane@example.com,jane\nJANE@example.com,other\nbob@example.com,Jane\n"
+        )
+        stdout, stderr = self.import_users(path, "--dry-run", "--batch-size=1")
+
+        self.assertIn("Validated 1 users", stdout)
+        self.assertIn("skipped 2", stdout)
+        self.assertIn("line 3: duplicate email or username in input", stderr)
+        self.assertIn("line 4: duplicate email or username in input", stderr)
+
+    def test_missing_file_is_a_command_error(self):
+        """Test that an unreadable input file stops with a CommandError"""
+        with self.assertRaisesMessage(CommandError, "Cannot read"):
+            self.import_users(str(Path(self.tmpdir.name) / "missing.csv"))
+
+
+class ProfileStartupCommandTests(TestCase):
+    """Test cases for the profile_startup management command"""
+
+    def test_json_report(self):
+        """Test that a cold start reports phases, apps and module import times"""
+        stdout = StringIO()
+        call_command("profile_startup", "--runs=1", "--json", stdout=stdout)
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(list(report["phases"]), ["django", "settings", "apps", "urlconf", "middleware"])
+        self.assertIn("ready", report["apps"]["users"])
+        self.assertIn("django_project.settings", report["imports"])
+
+
+class ArchiveAuditlogCommandTests(TestCase):
+    """Test cases for the archive_auditlog management command"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for name in ("jane", "john", "jim"):
+            User.objects.create_user(username=name, email=f"{name}@example.com")
+        # Two entries past the retention period, one recent
+        old = LogEntry.objects.order_by("pk")[:2].values_list("pk", flat=True)
+        LogEntry.objects.filter(pk__in=list(old)).update(timestamp=timezone.now() - timedelta(days=400))
+
+    def archive(self, *args):
+        stdout = StringIO()
+        call_command("archive_auditlog", "--days=365", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_old_entries_are_archived_then_deleted(self):
+        """Test that old entries end up in the gzipped JSONL archive, batch by batch, and leave the table"""
+        out = self.archive(f"--archive-dir={self.tmpdir.name}", "--batch-size=1")
+        self.assertIn("Removed 2 entries", out)
+        self.assertEqual(LogEntry.objects.count(), 1)
+
+        (path,) = Path(self.tmpdir.name).glob("auditlog-*.jsonl.gz")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row["object_repr"] for row in rows], ["jane - jane@example.com", "john - john@example.com"])
+        self.assertIn("changes", rows[0])
+
+    def test_nothing_to_archive_leaves_no_file(self):
+        """Test that a run with nothing to remove writes no archive"""
+        self.archive(f"--archive-dir={self.tmpdir.name}")
+        self.assertIn("Removed 0 entries", self.archive(f"--archive-dir={self.tmpdir.name}"))
+        self.assertEqual(len(list(Path(self.tmpdir.name).glob("*.gz"))), 1)
+
+    def test_purge_without_archive(self):
+        """Test that --no-archive deletes and that archiving needs a directory"""
+        with self.assertRaises(CommandError):
+            self.archive()
+        self.archive("--no-archive")
+        self.assertEqual(LogEntry.objects.count(), 1)
+
+
+class RollupUsersCommandTests(TestCase):
+    """Test cases for the rollup_users management command"""
+
+    def test_recounts_the_rollups(self):
+        """Test that the rollups are rebuilt from the users table"""
+        User.objects.create_user(username="jane", email="jane@example.com")
+        User.objects.update(is_staff=True)
+        stdout = StringIO()
+        call_command("rollup_users", stdout=stdout)
+        self.assertIn("Recounted 1 days", stdout.getvalue())
+        self.assertEqual(UserDailyStats.objects.get().staff, 1)
+        with self.assertRaises(CommandError):
+            call_command("rollup_users", "--since=yesterday")
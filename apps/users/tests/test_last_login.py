@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from allauth.account.forms import default_token_generator
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.users.last_login import buffer
+from django_project.metrics import registry
+
+User = get_user_model()
+
+
+class LastLoginTests(TestCase):
+    """Test cases for the write-behind last_login updates"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="jane", email="jane@example.com", password="testpass123")
+
+    def tearDown(self):
+        buffer.flush()
+
+    def login(self):
+        response = self.client.post(
+            reverse("accounts:login"),
+            {"email": "jane@example.com", "password": "testpass123"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+
+    def test_login_writes_only_last_login(self):
+        """Test that a login stores last_login without touching modified or updated_by"""
+        modified = self.user.modified
+        self.login()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertEqual(self.user.modified, modified)
+        self.assertIsNone(self.user.updated_by)
+
+    @override_settings(LAST_LOGIN_PRECISION=60)
+    def test_logins_within_precision_are_skipped(self):
+        """Test that a login shortly after the stored last_login writes nothing"""
+        last_login = timezone.now() - timedelta(seconds=30)
+        User.objects.filter(pk=self.user.pk).update(last_login=last_login)
+        self.user.refresh_from_db()
+        skipped = registry.value("auth_last_login_writes_total", mode="skipped")
+        self.client.force_login(self.user)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, last_login)
+        self.assertEqual(registry.value("auth_last_login_writes_total", mode="skipped"), skipped + 1)
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_deferred_logins_are_coalesced_and_flushed_in_bulk(self):
+        """Test that buffered logins are written together, once per user, on flush"""
+        other = User.objects.create_user(username="john", email="john@example.com", password="testpass123")
+        self.login()
+        self.assertIsNone(self.user.last_login)
+        self.login()
+        self.client.force_login(other)
+
+        self.assertEqual(len(buffer.pending), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(buffer.flush(), 2)
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertIsNotNone(other.last_login)
+        self.assertEqual(buffer.flush(), 0)
+
+
+class ResetTokenTests(TestCase):
+    """Test cases for how last_login writes affect password reset tokens"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="jane", email="jane@example.com", password="testpass123")
+        User.objects.filter(pk=cls.user.pk).update(last_login=timezone.now() - timedelta(seconds=30))
+
+    def setUp(self):
+        self.user.refresh_from_db()
+        self.token = default_token_generator.make_token(self.user)
+
+    def tearDown(self):
+        buffer.flush()
+
+    def token_is_valid(self, token=None):
+        return default_token_generator.check_token(User.objects.get(pk=self.user.pk), token or self.token)
+
+    def test_login_invalidates_reset_tokens(self):
+        """Test that by default a login invalidates the tokens issued before it"""
+        self.client.force_login(self.user)
+        self.assertFalse(self.token_is_valid())
+
+    @override_settings(LAST_LOGIN_PRECISION=60)
+    def test_login_within_precision_keeps_reset_tokens(self):
+        """Test that a login within LAST_LOGIN_PRECISION leaves earlier tokens valid"""
+        self.client.force_login(self.user)
+        self.assertTrue(self.token_is_valid())
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=3600)
+    def test_deferred_login_invalidates_reset_tokens_when_written(self):
+        """Test that a deferred login invalidates tokens on flush, including one issued after the login"""
+        self.client.force_login(self.user)
+        self.assertTrue(self.token_is_valid())
+        later = default_token_generator.make_token(User.objects.get(pk=self.user.pk))
+
+        buffer.flush()
+        self.assertFalse(self.token_is_valid())
+        self.assertFalse(self.token_is_valid(later))
@@ -0,0 +1,157 @@
+from allauth.account.internal.userkit import filter_users_by_email
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.db.models.functions import Lower
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.users.models import Profile
+
+User = get_user_model()
+
+
+class TimeStampedModelTests(TestCase):
+    """Test cases for the modification timestamp of users and profiles"""
+
+    def test_partial_save_updates_modified(self):
+        """Test that save(update_fields=...) also stores the new modified time"""
+        user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        modified = user.modified
+        user.first_name = "Test"
+        user.save(update_fields=["first_name"])
+        user.refresh_from_db()
+        self.assertGreater(user.modified, modified)
+
+    def test_update_modified_false_is_respected(self):
+        """Test that update_modified=False still leaves modified untouched"""
+        user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        modified = user.modified
+        user.first_name = "Test"
+        user.save(update_fields=["first_name"], update_modified=False)
+        user.refresh_from_db()
+        self.assertEqual(user.modified, modified)
+
+
+class DirtyFieldSaveTests(TestCase):
+    """Test cases for saves that write only the changed fields of users and profiles"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        Profile.objects.create(user=user, phone="+256781435857")
+
+    def setUp(self):
+        self.user = User.objects.get(username="testuser")
+
+    def test_unchanged_save_is_skipped(self):
+        """Test that saving an unchanged instance runs no query and keeps modified"""
+        profile = Profile.objects.get(user=self.user)
+        modified = profile.modified
+        profile.phone = "+256781435857"
+        with self.assertNumQueries(0):
+            profile.save()
+            self.user.save()
+        profile.refresh_from_db()
+        self.assertEqual(profile.modified, modified)
+
+    def test_save_writes_only_changed_fields(self):
+        """Test that a save updates the changed columns, modified and updated_by only"""
+        modified = self.user.modified
+        self.user.first_name = "Test"
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+        (sql,) = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        for column in ("first_name", "modified", "updated_by_id"):
+            self.assertIn(f'"{column}"', sql)
+        self.assertNotIn('"email"', sql)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Test")
+        self.assertGreater(self.user.modified, modified)
+
+        # Saved values are the new baseline
+        with self.assertNumQueries(0):
+            self.user.save()
+
+    def test_partial_save_keeps_other_changes_dirty(self):
+        """Test that save(update_fields=...) only marks the saved fields clean"""
+        self.user.first_name = "Saved"
+        self.user.last_name = "Unsaved"
+        self.user.save(update_fields=["first_name"])
+        self.assertEqual(self.user.get_dirty_fields(), {"last_name"})
+
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.first_name, self.user.last_name), ("Saved", "Unsaved"))
+
+    def test_deleted_instance_is_saved_again(self):
+        """Test that saving a deleted instance inserts it again"""
+        profile = Profile.objects.get(user=self.user)
+        profile.delete()
+        profile.save()
+        self.assertEqual(Profile.objects.get(user=self.user).phone, "+256781435857")
+
+    def test_force_insert_saves_the_whole_instance(self):
+        """Test that force_insert inserts a loaded instance even when nothing changed"""
+        profile = Profile.objects.get(user=self.user)
+        Profile.objects.filter(pk=profile.pk).delete()
+        profile.save(force_insert=True)
+        self.assertTrue(Profile.objects.filter(pk=profile.pk, phone="+256781435857").exists())
+
+    def test_refresh_resets_the_baseline(self):
+        """Test that values reloaded by refresh_from_db are not dirty"""
+        User.objects.filter(pk=self.user.pk).update(last_name="Other")
+        self.user.refresh_from_db(fields=["last_name"])
+        self.assertEqual(self.user.get_dirty_fields(), set())
+
+
+class EmailLookupTests(TestCase):
+    """Test cases for case-insensitive email lookups and uniqueness"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="mixed", email="Mixed.Case@Example.com")
+
+    def test_exact_lookup_ignores_case(self):
+        """Test that email= matches the address in any case"""
+        self.assertEqual(User.objects.get(email="mixed.case@example.com"), self.user)
+        self.assertEqual(filter_users_by_email("MIXED.case@example.com"), [self.user])
+
+    def test_email_is_unique_ignoring_case(self):
+        """Test that a second user can't take the same address in another case"""
+        with self.assertRaises(IntegrityError):
+            User.objects.create_user(username="other", email="mixed.case@EXAMPLE.COM")
+
+    def test_users_without_email_are_not_unique(self):
+        """Test that any number of users can leave the email empty"""
+        User.objects.create_user(username="first")
+        User.objects.create_user(username="second")
+        self.assertEqual(User.objects.filter(email="").count(), 2)
+
+    def test_empty_email_lookup_matches_only_empty_emails(self):
+        """Test that email="" finds the users without an address and exclude(email="") the others"""
+        without_email = User.objects.create_user(username="noemail")
+        self.assertEqual(list(User.objects.filter(email="")), [without_email])
+        self.assertEqual(list(User.objects.exclude(email="")), [self.user])
+
+    def test_null_email_lookup_is_null(self):
+        """Test that email=None is still an IS NULL lookup, not a comparison of lowered values"""
+        User.objects.create_user(username="noemail")
+        queryset = User.objects.filter(email=None)
+        sql = str(queryset.query)
+        self.assertIn('"email" IS NULL', sql)
+        self.assertNotIn("LOWER", sql.upper())
+        self.assertFalse(queryset.exists())
+
+    def test_email_lookups_use_an_index(self):
+        """Test that the database serves email lookups from the Lower(email) index"""
+        if connection.vendor != "sqlite":
+            self.skipTest("Query plan checked on SQLite only")
+        for queryset in (
+            User.objects.filter(email="mixed.case@example.com"),
+            User.objects.annotate(email_lower=Lower("email")).filter(email_lower__in=["mixed.case@example.com"]),
+        ):
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = " ".join(str(row) for row in cursor.fetchall())
+            self.assertIn("users_user_email_lower_idx", plan)
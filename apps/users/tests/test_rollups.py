@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.users.models import UserDailyStats
+from apps.users.rollups import STATS, rebuild
+
+User = get_user_model()
+
+
+class UserRollupTests(TestCase):
+    """Test cases for the per-day user rollups"""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.jane = User.objects.create_user(username="jane", email="jane@example.com")
+        self.staff = User.objects.create_user(username="staff", email="staff@example.com", is_staff=True)
+        User.objects.create_user(username="inactive", email="inactive@example.com", is_active=False)
+        EmailAddress.objects.create(user=self.jane, email="jane@example.com", verified=True, primary=True)
+        EmailAddress.objects.create(user=self.staff, email="staff@example.com", verified=False, primary=True)
+
+    def stats(self):
+        return {row.pop("day"): row for row in UserDailyStats.objects.order_by("day").values("day", *STATS)}
+
+    def assertMatchesRecount(self):
+        kept = self.stats()
+        rebuild()
+        self.assertEqual(kept, self.stats())
+
+    def test_signups_are_counted(self):
+        """Test that new users and email addresses are counted on their signup day"""
+        self.assertEqual(
+            self.stats(),
+            {self.today: {"signups": 3, "active": 2, "staff": 1, "verified_emails": 1, "unverified_emails": 1}},
+        )
+
+    def test_changes_are_applied_incrementally(self):
+        """Test that updates, verifications and deletions keep the stats equal to a recount"""
+        jane = User.objects.get(pk=self.jane.pk)
+        jane.is_active = False
+        jane.save()
+        address = EmailAddress.objects.get(email="staff@example.com")
+        address.verified = True
+        address.save(update_fields=["verified"])
+        User.objects.get(username="inactive").delete()
+        self.staff.delete()
+        self.assertEqual(self.stats()[self.today]["signups"], 1)
+        self.assertMatchesRecount()
+
+    def test_changed_signup_day_moves_the_user(self):
+        """Test that changing date_joined recounts both days"""
+        jane = User.objects.get(pk=self.jane.pk)
+        jane.date_joined -= timedelta(days=3)
+        jane.save()
+        stats = self.stats()
+        self.assertEqual(stats[self.today - timedelta(days=3)]["verified_emails"], 1)
+        self.assertEqual(stats[self.today]["signups"], 2)
+        self.assertMatchesRecount()
+
+    def test_rebuild_since(self):
+        """Test that rebuild(since=...) leaves older days alone"""
+        UserDailyStats.objects.create(day=self.today - timedelta(days=10), signups=5)
+        UserDailyStats.objects.filter(day=self.today).update(signups=99)
+        self.assertEqual(rebuild(since=self.today), 1)
+        stats = self.stats()
+        self.assertEqual(stats[self.today]["signups"], 3)
+        self.assertEqual(stats[self.today - timedelta(days=10)]["signups"], 5)
@@ -0,0 +1,72 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from apps.users.models import Profile
+from apps.users.search import TSVECTOR_TABLE, index_users, search
+
+User = get_user_model()
+
+
+class UserSearchTests(TestCase):
+    """Test cases for the full-text user search and its index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.jane = User.objects.create_user(username="jane", email="jane@example.com", first_name="Jane")
+        cls.john = User.objects.create_user(username="john", email="john@sample.org", last_name="Doe")
+
+    def find(self, text):
+        return [user.username for user in search(User.objects.all(), text)]
+
+    def test_matches_prefixes_of_every_word(self):
+        """Test that every word must prefix-match some indexed word"""
+        self.assertEqual(self.find("Ja"), ["jane"])
+        self.assertEqual(self.find("sample john"), ["john"])
+        self.assertEqual(self.find("sample jane"), [])
+        self.assertEqual(self.find("  "), [])
+
+    def test_full_emails_and_phone_numbers_match(self):
+        """Test that a whole email address, username or phone number finds its user"""
+        Profile.objects.create(user=self.jane, phone="+256781435857")
+        User.objects.create_user(username="jane_doe", email="jd@elsewhere.net")
+        self.assertEqual(self.find("jane@example.com"), ["jane"])
+        self.assertEqual(self.find("John@Sample.org"), ["john"])
+        self.assertEqual(self.find("+256781435857"), ["jane"])
+        self.assertEqual(self.find("jane_doe"), ["jane_doe"])
+
+    @skipUnless(connection.vendor == "postgresql", "tsvector documents exist on PostgreSQL only")
+    def test_documents_are_split_at_punctuation(self):
+        """Test that PostgreSQL indexes the words of emails and phone numbers, not hosts and signed numbers"""
+        Profile.objects.create(user=self.jane, phone="+256781435857")
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT document::text FROM {TSVECTOR_TABLE} WHERE user_id = %s", [self.jane.pk])
+            (document,) = cursor.fetchone()
+        for word in ("'jane'", "'example'", "'com'", "'256781435857'"):
+            self.assertIn(word, document)
+        self.assertNotIn("example.com", document)
+
+    def test_index_follows_changes(self):
+        """Test that saving users and profiles, and deleting users, updates the index"""
+        john = User.objects.get(pk=self.john.pk)
+        john.last_name = "Smith"
+        john.save()
+        self.assertEqual(self.find("smith"), ["john"])
+        self.assertEqual(self.find("doe"), [])
+
+        profile = Profile.objects.create(user=self.jane, phone="+256781435857")
+        self.assertEqual(self.find("+256781"), ["jane"])
+        profile.delete()
+        self.assertEqual(self.find("256781"), [])
+
+        john.delete()
+        self.assertEqual(self.find("smith"), [])
+
+    def test_bulk_writes_need_reindexing(self):
+        """Test that writes bypassing signals show up once index_users() runs"""
+        User.objects.filter(pk=self.jane.pk).update(first_name="Janet")
+        self.assertEqual(self.find("janet"), [])
+        index_users([self.jane.pk])
+        self.assertEqual(self.find("janet"), ["jane"])
@@ -0,0 +1,92 @@
+"""
+Cost of saving a user with audit logging off, with auditlog's stock update receiver
+(which reloads the row to diff against) and with the receiver of `apps.users.audit`,
+both using the tracked-field allowlist in settings.
+
+    uv run python -m benchmarks.audit --saves 2000
+"""
+
+import argparse
+import os
+import statistics
+import time
+from contextlib import contextmanager, nullcontext
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.test_settings")
+django.setup()
+
+from auditlog.context import disable_auditlog  # noqa: E402
+from auditlog.receivers import log_update as auditlog_log_update  # noqa: E402
+from auditlog.registry import auditlog  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models.signals import pre_save  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from apps.users import audit  # noqa: E402
+from apps.users.models import User  # noqa: E402
+
+# What each save changes: a tracked field, or only untracked ones
+CHANGES = {
+    "tracked (first_name)": lambda user, i: setattr(user, "first_name", f"Bench {i}"),
+    "untracked (password)": lambda user, i: setattr(user, "password", f"hash {i}"),
+}
+
+
+@contextmanager
+def stock_receiver():
+    pre_save.disconnect(sender=User, dispatch_uid="apps.users.audit.log_update")
+    pre_save.connect(
+        auditlog_log_update, sender=User, dispatch_uid=auditlog._dispatch_uid(pre_save, auditlog_log_update)
+    )
+    try:
+        yield
+    finally:
+        audit.connect(User)
+
+
+MODES = {"off": disable_auditlog, "auditlog": stock_receiver, "scoped": nullcontext}
+
+
+def timed(user, change, saves):
+    timings = []
+    for i in range(saves):
+        change(user, i)
+        started = time.perf_counter()
+        user.save()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def measure(change, saves, rounds=10):
+    """Median µs per save for each mode, alternating rounds to even out noise."""
+    user = User.objects.get(username="bench")
+    timings = {mode: [] for mode in MODES}
+    for _ in range(rounds):
+        for mode, context in MODES.items():
+            with context():
+                timings[mode] += timed(user, change, saves // rounds)
+    return {mode: statistics.median(values) * 1e6 for mode, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saves", type=int, default=1000, help="Saves per case and mode")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        User.objects.create_user(username="bench", email="bench@example.com", password="bench")
+
+        print(f"{'change':24}" + "".join(f"{mode + ' µs':>14}" for mode in MODES))
+        for name, change in CHANGES.items():
+            medians = measure(change, args.saves)
+            print(f"{name:24}" + "".join(f"{medians[mode]:>14.1f}" for mode in MODES))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Latency of the email lookups behind every login and registration, with and without
+the `Lower("email")` index on users_user. The users' addresses are unverified, so
+allauth's lookup goes through both EmailAddress and the user table.
+
+    uv run python -m benchmarks.auth --users 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.test_settings")
+django.setup()
+
+from allauth.account.internal.userkit import filter_users_by_email  # noqa: E402
+from allauth.account.models import EmailAddress  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from apps.users.models import User  # noqa: E402
+
+INDEX = next(index for index in User._meta.indexes if index.name == "users_user_email_lower_idx")
+
+# What each lookup runs, for an address typed in any case
+LOOKUPS = {
+    "EmailAddress": lambda email: list(EmailAddress.objects.filter(email=email.lower())),
+    "User": lambda email: list(User.objects.filter(email=email)),
+    "login (allauth)": lambda email: filter_users_by_email(email, prefer_verified=True, for_login=True),
+}
+
+
+def seed(count, batch_size=10000):
+    for start in range(0, count, batch_size):
+        User.objects.bulk_create(
+            User(username=f"bench{i}", email=f"Bench{i}@Example.com", password="!")
+            for i in range(start, min(start + batch_size, count))
+        )
+    table, users = connection.ops.quote_name(EmailAddress._meta.db_table), connection.ops.quote_name("users_user")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (user_id, email, verified, "primary") SELECT id, LOWER(email), %s, %s FROM {users}',
+            [False, True],
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def measure(lookup, emails):
+    """Median and p95 µs per lookup."""
+    timings = []
+    for email in emails:
+        started = time.perf_counter()
+        lookup(email)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(len(timings) * 0.95)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000, help="Users in the dataset")
+    parser.add_argument("--lookups", type=int, default=200, help="Lookups per case and mode")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        started = time.perf_counter()
+        seed(args.users)
+        print(f"Seeded {args.users} users in {time.perf_counter() - started:.1f}s\n")
+        emails = [f"bench{random.randrange(args.users)}@EXAMPLE.com" for _ in range(args.lookups)]
+
+        results = {"indexed": {name: measure(lookup, emails) for name, lookup in LOOKUPS.items()}}
+        with connection.schema_editor() as schema_editor:
+            schema_editor.remove_index(User, INDEX)
+        results["no index"] = {name: measure(lookup, emails) for name, lookup in LOOKUPS.items()}
+
+        print(f"{'lookup':18}" + "".join(f"{mode + ' p50 µs':>18}{mode + ' p95 µs':>18}" for mode in results))
+        for name in LOOKUPS:
+            print(
+                f"{name:18}"
+                + "".join(f"{results[mode][name][0]:>18.1f}{results[mode][name][1]:>18.1f}" for mode in results)
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare DRF's stdlib JSON renderer/parser with the orjson-backed ones on user list pages.
+
+    uv run python -m benchmarks.json_rendering --page-size 100 --rounds 500
+"""
+
+import argparse
+import datetime
+import io
+import os
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.settings")
+django.setup()
+
+from rest_framework.parsers import JSONParser as StdlibJSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer as StdlibJSONRenderer  # noqa: E402
+
+from django_project.parsers import JSONParser  # noqa: E402
+from django_project.renderers import JSONRenderer, orjson  # noqa: E402
+
+
+def user_page(page_size):
+    """A page shaped like `UserViewSet.list()` output."""
+    joined = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+    results = []
+    for i in range(1, page_size + 1):
+        timestamp = (joined + datetime.timedelta(minutes=i)).isoformat().replace("+00:00", "Z")
+        results.append(
+            {
+                "id": i,
+                "password": "pbkdf2_sha256$1000000$" + "x" * 66,
+                "last_login": timestamp,
+                "is_superuser": False,
+                "username": f"user{i}",
+                "first_name": "Jöhn",
+                "last_name": f"Doe {i}",
+                "email": f"user{i}@example.com",
+                "is_staff": i % 50 == 0,
+                "is_active": True,
+                "date_joined": timestamp,
+                "created": timestamp,
+                "modified": timestamp,
+                "author": None,
+                "updated_by": None,
+                "groups": [1, 2] if i % 10 == 0 else [],
+                "user_permissions": [],
+            }
+        )
+    return {
+        "count": page_size * 100,
+        "next": "http://testserver/api/users/users/?page=3",
+        "previous": "http://testserver/api/users/users/?page=1",
+        "results": results,
+    }
+
+
+def bench(func, rounds):
+    return min(timeit.repeat(func, number=rounds, repeat=5)) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    page = user_page(args.page_size)
+    body = StdlibJSONRenderer().render(page)
+    context = {"encoding": "utf-8"}
+    print(f"page of {args.page_size} users, {len(body) / 1024:.1f} KiB, orjson {'on' if orjson else 'NOT installed'}")
+
+    stdlib_renderer, fast_renderer = StdlibJSONRenderer(), JSONRenderer()
+    stdlib_parser, fast_parser = StdlibJSONParser(), JSONParser()
+    rows = [
+        ("render", lambda: stdlib_renderer.render(page), lambda: fast_renderer.render(page)),
+        (
+            "parse",
+            lambda: stdlib_parser.parse(io.BytesIO(body), parser_context=context),
+            lambda: fast_parser.parse(io.BytesIO(body), parser_context=context),
+        ),
+    ]
+    print(f"{'':8}{'stdlib (us)':>14}{'fast (us)':>14}{'speedup':>10}")
+    for name, stdlib, fast in rows:
+        stdlib_time = bench(stdlib, args.rounds)
+        fast_time = bench(fast, args.rounds)
+        print(f"{name:8}{stdlib_time * 1e6:14.1f}{fast_time * 1e6:14.1f}{stdlib_time / fast_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
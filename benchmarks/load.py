@@ -0,0 +1,255 @@
+"""
+Offline load test for the auth and users API.
+
+Creates a throwaway test database, seeds it with users and drives concurrent
+requests through Django's test client (no network, no running server), then
+reports throughput, latency percentiles and queries per request per scenario.
+
+    uv run python -m benchmarks.load --users 1000 --requests 300 --concurrency 8
+    uv run python -m benchmarks.load --save benchmarks/baselines/load.json
+    uv run python -m benchmarks.load --compare benchmarks/baselines/load.json
+
+`--compare` exits with status 1 when a scenario's p95 latency or RPS regressed by
+more than `--tolerance` against the saved baseline.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.test_settings")
+django.setup()
+
+from allauth.account.models import EmailAddress  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+User = get_user_model()
+
+PASSWORD = "benchmark-password"
+MD5_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+class Scenario(ABC):
+    """One endpoint under load. `request()` is called with a per-thread APIClient."""
+
+    name = None
+    authenticated = False
+    expected_status = 200
+
+    def __init__(self, user_ids, emails):
+        self.user_ids = user_ids
+        self.emails = emails
+
+    @abstractmethod
+    def request(self, client, state):
+        """Send one request with `client` and return its response."""
+
+
+class Login(Scenario):
+    name = "login"
+
+    def request(self, client, state):
+        data = {"email": random.choice(self.emails), "password": PASSWORD}
+        return client.post("/api/accounts/login/", data, format="json")
+
+
+class TokenRefresh(Scenario):
+    name = "token_refresh"
+    authenticated = True
+
+    def request(self, client, state):
+        return client.post("/api/accounts/token/refresh/", {"refresh": state["refresh"]}, format="json")
+
+
+class CurrentUser(Scenario):
+    name = "current_user"
+    authenticated = True
+
+    def request(self, client, state):
+        return client.get("/api/accounts/user/")
+
+
+class UsersList(Scenario):
+    name = "users_list"
+    authenticated = True
+
+    def request(self, client, state):
+        pages = max(1, len(self.user_ids) // settings.REST_FRAMEWORK["PAGE_SIZE"])
+        return client.get("/api/users/users/", {"page": random.randint(1, pages)})
+
+
+class UsersRetrieve(Scenario):
+    name = "users_retrieve"
+    authenticated = True
+
+    def request(self, client, state):
+        return client.get(f"/api/users/users/{random.choice(self.user_ids)}/")
+
+
+class Registration(Scenario):
+    name = "registration"
+    expected_status = 201
+    counter = itertools.count()
+
+    def request(self, client, state):
+        email = f"signup{next(self.counter)}@bench.example.com"
+        data = {"email": email, "password1": "Bench-pass-123", "password2": "Bench-pass-123"}
+        return client.post("/api/accounts/registration/", data, format="json")
+
+
+SCENARIOS = {scenario.name: scenario for scenario in Scenario.__subclasses__()}
+
+
+def seed(count):
+    password = make_password(PASSWORD)
+    users = User.objects.bulk_create(
+        User(username=f"bench{i}", email=f"bench{i}@example.com", password=password) for i in range(count)
+    )
+    EmailAddress.objects.bulk_create(
+        EmailAddress(user=user, email=user.email, primary=True, verified=True) for user in users
+    )
+    return [user.pk for user in users], [user.email for user in users]
+
+
+def run_scenario(scenario, total, concurrency):
+    latencies, queries, errors = [], [], []
+    lock = threading.Lock()
+
+    def worker(share):
+        client = APIClient()
+        state = {}
+        if scenario.authenticated:
+            refresh = RefreshToken.for_user(User.objects.get(pk=random.choice(scenario.user_ids)))
+            state["refresh"] = str(refresh)
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        try:
+            for _ in range(share):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = scenario.request(client, state)
+                    elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    queries.append(len(captured))
+                    if response.status_code != scenario.expected_status:
+                        errors.append(response.status_code)
+        finally:
+            connections.close_all()
+
+    shares = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, shares))
+    wall = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / wall,
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "queries": statistics.mean(queries),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against `baseline` and return the names of regressed scenarios."""
+    regressed = []
+    print(f"\n{'scenario':16}{'rps':>16}{'p95 ms':>18}{'queries':>16}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        rps_change = result["rps"] / base["rps"] - 1
+        p95_change = result["p95_ms"] / base["p95_ms"] - 1
+        flag = ""
+        if rps_change < -tolerance or p95_change > tolerance:
+            regressed.append(name)
+            flag = "  REGRESSED"
+        queries_change = result["queries"] - base["queries"]
+        print(f"{name:16}{rps_change:>+16.1%}{p95_change:>+18.1%}{queries_change:>+16.1f}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500, help="Users to seed")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client threads")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated scenarios to run")
+    parser.add_argument(
+        "--hasher",
+        choices=("md5", "default"),
+        default="md5",
+        help="md5 measures the request path; default includes the real PBKDF2 cost in login/registration",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible runs")
+    parser.add_argument("--save", type=Path, help="Write the results to this baseline file")
+    parser.add_argument("--compare", type=Path, help="Compare the results against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 20%%)")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - SCENARIOS.keys()
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    random.seed(args.seed)
+    setup_test_environment(debug=False)
+    if args.hasher == "md5":
+        settings.PASSWORD_HASHERS = MD5_HASHERS
+
+    # A file-backed SQLite database, so the client threads see the same data
+    tmpdir = tempfile.TemporaryDirectory()
+    if connection.vendor == "sqlite":
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(tmpdir.name, "bench.sqlite3")
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        user_ids, emails = seed(args.users)
+        results = {}
+        print(f"{args.users} users, {args.requests} requests per scenario, concurrency {args.concurrency}\n")
+        print(f"{'scenario':16}{'requests':>9}{'errors':>8}{'rps':>9}", end="")
+        print(f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+        for name in args.scenarios.split(","):
+            result = run_scenario(SCENARIOS[name](user_ids, emails), args.requests, args.concurrency)
+            results[name] = result
+            print(
+                f"{name:16}{result['requests']:>9}{result['errors']:>8}{result['rps']:>9.1f}"
+                f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['queries']:>9.1f}"
+            )
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        tmpdir.cleanup()
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        if compare(results, json.loads(args.compare.read_text()), args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-request middleware overhead of `/api/` requests with the full MIDDLEWARE stack
+("before") and with the trimmed API_MIDDLEWARE profile ("after").
+
+    uv run python -m benchmarks.middleware --requests 2000
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.test_settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from apps.users.models import User  # noqa: E402
+
+REQUESTS = {
+    # Resolves to nothing: middleware and URL resolving only
+    "unmatched /api/ path": ("/api/nonexistent/", 404),
+    "current user (JWT)": ("/api/accounts/user/", 200),
+}
+
+
+def timed(client, path, status, requests):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == status, (path, response.status_code)
+    return timings
+
+
+def measure(path, status, headers, requests, rounds=10):
+    """Median µs per request for (before, after), alternating rounds to even out noise."""
+    before_client, after_client = Client(headers=headers), Client(headers=headers)
+    # Clients load the middleware on their first request
+    with override_settings(MIDDLEWARE_PROFILES={}):
+        before_client.get(path)
+    after_client.get(path)
+
+    before, after = [], []
+    for _ in range(rounds):
+        before += timed(before_client, path, status, requests // rounds)
+        after += timed(after_client, path, status, requests // rounds)
+    return statistics.median(before) * 1e6, statistics.median(after) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per case")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        user = User.objects.create_user(username="bench", email="bench@example.com", password="bench")
+        headers = {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+        print(f"{'request':24}{'before µs':>11}{'after µs':>10}{'saved µs':>10}")
+        for name, (path, status) in REQUESTS.items():
+            before, after = measure(path, status, headers, args.requests)
+            print(f"{name:24}{before:>11.1f}{after:>10.1f}{before - after:>10.1f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
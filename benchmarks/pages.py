@@ -0,0 +1,84 @@
+"""
+Server-side render time of the public and account pages, with and without caching.
+
+"uncached" renders with the plain (non-caching) template loaders and a dummy
+cache, as before page and fragment caching; "cached" uses the project settings.
+
+    uv run python -m benchmarks.pages --requests 500
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.test_settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from apps.users.models import Profile, User  # noqa: E402
+
+PAGES = {
+    "index (anonymous)": ("/", False),
+    "index (signed in)": ("/", True),
+    "profile": ("/accounts/profile/", True),
+    "phone change": ("/accounts/phone/change/", True),
+}
+
+
+def uncached():
+    options = {**settings.TEMPLATES[0]["OPTIONS"]}
+    options["loaders"] = options["loaders"][0][1]
+    return override_settings(
+        TEMPLATES=[{**settings.TEMPLATES[0], "OPTIONS": options}],
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    )
+
+
+def measure(path, client, requests):
+    client.get(path)  # warm up
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, (path, response.status_code)
+    return statistics.mean(timings) * 1000, statistics.quantiles(timings, n=100)[94] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per page and mode")
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        user = User.objects.create_user(username="bench", email="bench@example.com", password="bench")
+        Profile.objects.create(user=user, phone="+256781435857")
+        anonymous, signed_in = Client(), Client()
+        signed_in.force_login(user)
+
+        print(f"{'page':20}{'uncached ms':>13}{'p95':>8}{'cached ms':>12}{'p95':>8}{'speedup':>9}")
+        for name, (path, authenticated) in PAGES.items():
+            client = signed_in if authenticated else anonymous
+            with uncached():
+                before = measure(path, client, args.requests)
+            cache.clear()
+            after = measure(path, client, args.requests)
+            print(f"{name:20}{before[0]:>13.3f}{before[1]:>8.3f}", end="")
+            print(f"{after[0]:>12.3f}{after[1]:>8.3f}{before[0] / after[0]:>8.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.translation import get_language
+
+
+def cache_anonymous_page(view):
+    """
+    Serve anonymous visitors a whole cached page for `PAGE_CACHE_TIMEOUT` seconds.
+
+    Only plain GET/HEAD requests without a query string are cached, and only while
+    the visitor has no pending messages, so flash messages (e.g. "You have signed
+    out") still render. Authenticated users always get a fresh page. Responses that
+    set cookies are never stored.
+
+    Pages are cached per URL (scheme, host, path and query, as Django's own cache
+    keys) and per active language.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ("GET", "HEAD")
+            or request.GET
+            or request.user.is_authenticated
+            or len(get_messages(request))
+        ):
+            return view(request, *args, **kwargs)
+
+        url = hashlib.sha256(request.build_absolute_uri().encode()).hexdigest()
+        key = f"page:{get_language()}:{url}"
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        if response.status_code == 200 and not response.cookies:
+            cache.set(key, (response.content, response["Content-Type"]), timeout=settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
@@ -0,0 +1,230 @@
+"""
+Response compression with gzip or, when the optional `brotli` (or `brotlicffi`)
+package is installed, brotli.
+
+A drop-in replacement for Django's `GZipMiddleware` that negotiates the encoding
+from Accept-Encoding (q-values included), skips small bodies, already-compressed
+content types and views marked `no_compression` (responses carrying tokens, see
+BREACH), and compresses `StreamingHttpResponse` bodies incrementally. Bytes in,
+bytes out and compression time are counted per encoding in `/metrics`.
+
+Like Django's GZipMiddleware, gzip bodies (streamed or not) start with a header of
+random length, which blurs the compressed size BREACH measures. That only slows the
+attack down, and brotli has no such header: brotli responses are not padded at all.
+Responses that both carry a secret and reflect request input must still be marked
+`no_compression`.
+"""
+
+import gzip
+import secrets
+import struct
+import time
+import zlib
+from contextlib import suppress
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from django_project.metrics import registry
+from django_project.middleware import HybridMiddleware
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Same BREACH mitigation as Django's GZipMiddleware (random bytes in the gzip header)
+MAX_RANDOM_BYTES = 100
+
+INCOMPRESSIBLE_TYPES = (
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+    "application/gzip",
+    "application/zip",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/zstd",
+    "application/pdf",
+    "application/octet-stream",
+)
+
+
+def gzip_header():
+    """A gzip header naming a file of 0 to MAX_RANDOM_BYTES - 1 bytes, as `compress_string()` writes."""
+    filename = b"a" * secrets.randbelow(MAX_RANDOM_BYTES) + b"\x00"
+    # Magic, deflate, FNAME flag, no mtime, no extra flags, unknown OS
+    return bytes([0x1F, 0x8B, zlib.DEFLATED, gzip.FNAME, 0, 0, 0, 0, 0, 0xFF]) + filename
+
+
+class GzipCompressor:
+    """Incremental gzip with the random-length header of `gzip_compress()`."""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._header = gzip_header()
+        self._crc = 0
+        self._size = 0
+
+    def process(self, data):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        header, self._header = self._header, b""
+        return header + self._compressor.compress(data)
+
+    def finish(self):
+        header, self._header = self._header, b""
+        return header + self._compressor.flush() + struct.pack("<II", self._crc, self._size & 0xFFFFFFFF)
+
+
+def gzip_compress(data):
+    return compress_string(data, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def brotli_compressor():
+    return brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def available_encodings():
+    """`{encoding: (compress, compressor factory)}` in order of preference."""
+    encodings = {}
+    if brotli is not None:
+        encodings["br"] = (brotli_compress, brotli_compressor)
+    encodings["gzip"] = (gzip_compress, GzipCompressor)
+    return encodings
+
+
+def negotiate(accept_encoding):
+    """Return the preferred encoding the client accepts, or None."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            with suppress(ValueError):
+                quality = float(params[2:])
+        accepted[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def no_compression(view):
+    """Mark a view's responses as never compressed, e.g. ones that carry tokens."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = view(*args, **kwargs)
+        response.no_compression = True
+        return response
+
+    return wrapper
+
+
+def record(encoding, size_in, size_out, seconds):
+    registry.inc("http_response_compression_bytes_total", size_in, encoding=encoding, stage="in")
+    registry.inc("http_response_compression_bytes_total", size_out, encoding=encoding, stage="out")
+    registry.inc("http_response_compression_seconds_total", seconds, encoding=encoding)
+
+
+def compress_stream(chunks, compressor, encoding):
+    size_in = size_out = 0
+    seconds = 0.0
+    try:
+        for chunk in chunks:
+            started = time.perf_counter()
+            data = compressor.process(chunk)
+            seconds += time.perf_counter() - started
+            size_in += len(chunk)
+            if data:
+                size_out += len(data)
+                yield data
+        data = compressor.finish()
+        size_out += len(data)
+        yield data
+    finally:
+        record(encoding, size_in, size_out, seconds)
+
+
+async def compress_async_stream(chunks, compressor, encoding):
+    size_in = size_out = 0
+    seconds = 0.0
+    try:
+        async for chunk in chunks:
+            started = time.perf_counter()
+            data = compressor.process(chunk)
+            seconds += time.perf_counter() - started
+            size_in += len(chunk)
+            if data:
+                size_out += len(data)
+                yield data
+        data = compressor.finish()
+        size_out += len(data)
+        yield data
+    finally:
+        record(encoding, size_in, size_out, seconds)
+
+
+class CompressionMiddleware(HybridMiddleware):
+    """
+    Compress responses with the best encoding the client accepts.
+
+    Keep it above any middleware that reads or changes the response body.
+    """
+
+    def call(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def acall(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if (
+            getattr(response, "no_compression", False)
+            or response.has_header("Content-Encoding")
+            or response.get("Content-Type", "").startswith(INCOMPRESSIBLE_TYPES)
+            or (not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE)
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+        compress, compressor = available_encodings()[encoding]
+
+        if response.streaming:
+            stream = compress_async_stream if response.is_async else compress_stream
+            response.streaming_content = stream(response.streaming_content, compressor(), encoding)
+            # The compressed size isn't known until the stream is done
+            del response.headers["Content-Length"]
+        else:
+            started = time.perf_counter()
+            content = compress(response.content)
+            record(encoding, len(response.content), len(content), time.perf_counter() - started)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        # A strong ETag no longer matches the encoded bytes, see RFC 9110 section 8.8.1
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
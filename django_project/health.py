@@ -0,0 +1,117 @@
+"""
+Liveness (`/healthz`) and readiness (`/readyz`) probes.
+
+`HealthCheckMiddleware` answers the probes before any other middleware runs, so
+they never touch sessions, authentication, CSRF, allauth or auditlog (and are not
+subject to ALLOWED_HOSTS, since orchestrators probe by pod IP).
+
+Readiness results are kept in-process for `HEALTH_CHECK_CACHE_SECONDS`, and
+concurrent probes share a single run, so probes can't pile load onto the
+database. Once all migrations are applied that check is not repeated: new
+migrations only arrive with new code, which means a new process.
+"""
+
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+from loguru import logger
+
+from django_project.middleware import HybridMiddleware
+
+LIVENESS_PATH = "/healthz"
+READINESS_PATH = "/readyz"
+
+_lock = threading.Lock()
+_result = None
+_checked_at = 0.0
+_migrated = False
+
+
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def check_cache():
+    key = f"health:{uuid.uuid4().hex}"
+    cache.set(key, 1, timeout=10)
+    if cache.get(key) != 1:
+        raise RuntimeError("value written to the cache could not be read back")
+    cache.delete(key)
+
+
+def check_migrations():
+    global _migrated
+    if _migrated:
+        return
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        raise RuntimeError(f"{len(plan)} unapplied migrations")
+    _migrated = True
+
+
+CHECKS = {
+    "database": check_database,
+    "cache": check_cache,
+    "migrations": check_migrations,
+}
+
+
+def run_checks():
+    """Return `(ready, {check: "ok" | error})`."""
+    results = {}
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except Exception as e:
+            logger.warning(f"Readiness check {name} failed: {e}")
+            results[name] = str(e) or type(e).__name__
+        else:
+            results[name] = "ok"
+    return all(result == "ok" for result in results.values()), results
+
+
+def readiness():
+    global _result, _checked_at
+    with _lock:
+        if _result is None or time.monotonic() - _checked_at >= settings.HEALTH_CHECK_CACHE_SECONDS:
+            _result = run_checks()
+            _checked_at = time.monotonic()
+        return _result
+
+
+def reset():
+    global _result, _migrated
+    with _lock:
+        _result = None
+        _migrated = False
+
+
+def readiness_response(ready, checks):
+    return JsonResponse({"status": "ok" if ready else "unavailable", "checks": checks}, status=200 if ready else 503)
+
+
+class HealthCheckMiddleware(HybridMiddleware):
+    """Answer the probes directly; keep it first in MIDDLEWARE."""
+
+    def call(self, request):
+        if request.path == LIVENESS_PATH:
+            return JsonResponse({"status": "ok"})
+        if request.path == READINESS_PATH:
+            return readiness_response(*readiness())
+        return self.get_response(request)
+
+    async def acall(self, request):
+        if request.path == LIVENESS_PATH:
+            return JsonResponse({"status": "ok"})
+        if request.path == READINESS_PATH:
+            return readiness_response(*await sync_to_async(readiness)())
+        return await self.get_response(request)
@@ -0,0 +1,246 @@
+"""
+Prometheus-style metrics without extra dependencies.
+
+Each process keeps its counters and histograms in memory. With `METRICS_DIR` set
+(required when running several workers), every process also writes a snapshot of
+its metrics to `<METRICS_DIR>/<pid>-<start>.json` at most every
+`METRICS_FLUSH_INTERVAL` seconds, and `/metrics` adds up the snapshots of all
+processes, so a scrape sees the whole server no matter which worker answers it.
+Snapshots of exited workers are kept, so counters never go backwards.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import suppress
+from pathlib import Path
+
+from allauth.account.signals import user_signed_up
+from django.conf import settings
+from django.contrib.auth.decorators import login_not_required
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from django_project.middleware import HybridMiddleware
+from django_project.query_wrappers import request_wrapper
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "django_http_requests_total": "HTTP responses by method, route and status code",
+    "django_http_request_duration_seconds": "Time spent producing a response, by method and route",
+    "django_db_queries_total": "Database queries executed, by route",
+    "django_db_query_duration_seconds_total": "Time spent in database queries, by route",
+    "django_db_query_timeouts_total": "Requests whose query was cancelled for exceeding the route's budget, by route",
+    "django_cache_lookups_total": "Cache lookups by cache and result (hit or miss)",
+    "auth_events_total": "Authentication events (login, login_failed, signup, password_reset_request, ...)",
+    "auth_last_login_writes_total": "last_login updates by mode (sync, deferred, or skipped within the precision)",
+    "api_throttled_requests_total": "API requests rejected by a throttle, by scope",
+    "http_response_compression_bytes_total": "Response bytes before (in) and after (out) compression, by encoding",
+    "http_response_compression_seconds_total": "Time spent compressing responses, by encoding",
+}
+
+
+class Registry:
+    """Counters and histograms of the current process, keyed by `(name, labels)`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.process_id = f"{os.getpid()}-{time.time_ns()}"
+        self.flushed_at = 0.0
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            # `buckets` per-bucket counts (not cumulative) + overflow, then sum and count
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [list(buckets), [0] * (len(buckets) + 1), 0.0, 0]
+            histogram[1][bisect_left(buckets, value)] += 1
+            histogram[2] += value
+            histogram[3] += 1
+
+    def value(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[name, labels, value] for (name, labels), value in self.counters.items()],
+                "histograms": [
+                    [name, labels, buckets, list(counts), total, count]
+                    for (name, labels), (buckets, counts, total, count) in self.histograms.items()
+                ],
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def flush(self, force=False):
+        """Write this process's snapshot to `METRICS_DIR`, at most once per flush interval."""
+        directory = settings.METRICS_DIR
+        now = time.monotonic()
+        if not directory or (not force and now - self.flushed_at < settings.METRICS_FLUSH_INTERVAL):
+            return
+        self.flushed_at = now
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f.name, Path(directory) / f"{self.process_id}.json")
+
+
+registry = Registry()
+
+
+def collect():
+    """Merge the live metrics of this process with the flushed snapshots of every other process."""
+    snapshots = [registry.snapshot()]
+    if settings.METRICS_DIR:
+        for path in Path(settings.METRICS_DIR).glob("*.json"):
+            # Snapshots are replaced atomically; one removed mid-scrape is simply skipped
+            if path.stem != registry.process_id:
+                with suppress(OSError, ValueError):
+                    snapshots.append(json.loads(path.read_text()))
+
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets, counts, total, count in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [buckets, [0] * len(counts), 0.0, 0])
+            merged[1] = [a + b for a, b in zip(merged[1], counts, strict=True)]
+            merged[2] += total
+            merged[3] += count
+    return counters, histograms
+
+
+def _labels(labels, **extra):
+    items = [*labels, *extra.items()]
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped, strict=True)) + "}"
+
+
+def render(counters, histograms):
+    """Render metrics in the Prometheus text exposition format."""
+    lines = []
+    for kind, metrics in (("counter", counters), ("histogram", histograms)):
+        for name in sorted({name for name, _ in metrics}):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(metrics.items()):
+                if metric != name:
+                    continue
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {value}")
+                    continue
+                buckets, counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip([*buckets, "+Inf"], counts, strict=True):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+class QueryCounter:
+    """Execute wrapper counting queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """
+    Record latency, status and database usage per route.
+
+    Keep it first in MIDDLEWARE so the latency covers the whole stack. Routes are
+    labelled with their URL pattern (not the path), and unmatched requests share
+    one label, which keeps the number of series bounded. Queries are counted in
+    whichever thread runs them, see `django_project.query_wrappers`.
+    """
+
+    def call(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with request_wrapper(queries):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def acall(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with request_wrapper(queries):
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    def record(self, request, response, duration, queries):
+        match = request.resolver_match
+        route = match.route if match else "<unmatched>"
+        registry.inc("django_http_requests_total", method=request.method, route=route, status=response.status_code)
+        registry.observe("django_http_request_duration_seconds", duration, method=request.method, route=route)
+        if queries.count:
+            registry.inc("django_db_queries_total", queries.count, route=route)
+            registry.inc("django_db_query_duration_seconds_total", queries.seconds, route=route)
+        registry.flush()
+
+
+@login_not_required
+@require_GET
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    else:
+        # Without a token, only a development server serves them
+        allowed = settings.DEBUG
+    if not allowed:
+        return HttpResponseForbidden()
+    registry.flush(force=True)
+    return HttpResponse(render(*collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@receiver(user_logged_in)
+def count_login(sender, **kwargs):
+    registry.inc("auth_events_total", event="login")
+
+
+@receiver(user_login_failed)
+def count_login_failed(sender, **kwargs):
+    registry.inc("auth_events_total", event="login_failed")
+
+
+@receiver(user_signed_up)
+def count_signup(sender, **kwargs):
+    registry.inc("auth_events_total", event="signup")
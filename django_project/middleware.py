@@ -1,7 +1,46 @@
 import re
 
+from asgiref.local import Local
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from auditlog.cid import set_cid
+from auditlog.context import set_extra_data
+from auditlog.middleware import AuditlogMiddleware as BaseAuditlogMiddleware
+from author.backends import AuthorDefaultBackend
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.exception import convert_exception_to_response
 from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.module_loading import import_string
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+# The current request for AuthorBackend. django-author keeps it in a threading.local,
+# which every request served by one event loop would share; asgiref's Local is per
+# request context instead and follows it into the sync_to_async() threads of the ORM.
+_author_locals = Local()
+
+
+class HybridMiddleware:
+    """
+    Base class for middleware that runs natively under both WSGI and ASGI.
+
+    Django picks the mode from the rest of the chain; subclasses implement `call()`
+    and `acall()`, the sync and async versions of the same logic.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.acall(request)
+        return self.call(request)
 
 
 class CustomCsrfViewMiddleware(CsrfViewMiddleware):
@@ -27,3 +66,182 @@ class CustomCsrfViewMiddleware(CsrfViewMiddleware):
             return None
 
         return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class CsrfExemptUrlsMiddleware(HybridMiddleware):
+    """
+    Mark requests to `CSRF_EXEMPT_URLS` as CSRF exempt, as CustomCsrfViewMiddleware
+    does, for stacks without it (the /api/ profile). DRF's SessionAuthentication
+    skips its own CSRF check for such requests.
+    """
+
+    def exempt(self, request):
+        if any(re.match(pattern, request.path) for pattern in getattr(settings, "CSRF_EXEMPT_URLS", ())):
+            request._dont_enforce_csrf_checks = True
+
+    def call(self, request):
+        self.exempt(request)
+        return self.get_response(request)
+
+    async def acall(self, request):
+        self.exempt(request)
+        return await self.get_response(request)
+
+
+class WhiteNoiseMiddleware(HybridMiddleware, BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise's middleware, also under ASGI.
+
+    A sync-only middleware would make Django run everything above it, the
+    /api/ profile included, synchronously.
+    """
+
+    def __init__(self, get_response):
+        BaseWhiteNoiseMiddleware.__init__(self, get_response)
+        HybridMiddleware.__init__(self, get_response)
+
+    def call(self, request):
+        return BaseWhiteNoiseMiddleware.__call__(self, request)
+
+    async def acall(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Opens and stats the file
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class AuthorMiddleware(HybridMiddleware):
+    """django-author's AuthorDefaultBackendMiddleware, also under ASGI."""
+
+    def call(self, request):
+        _author_locals.request = request
+        try:
+            return self.get_response(request)
+        finally:
+            _author_locals.request = None
+
+    async def acall(self, request):
+        _author_locals.request = request
+        try:
+            return await self.get_response(request)
+        finally:
+            _author_locals.request = None
+
+
+class AuthorBackend(AuthorDefaultBackend):
+    """AuthorDefaultBackend reading the request kept by AuthorMiddleware."""
+
+    def __init__(self):
+        # AuthorDefaultBackend would insist on its own middleware being installed
+        pass
+
+    def _get_request(self):
+        # django-author 1.2's hook for where the request comes from (pinned in pyproject.toml)
+        return getattr(_author_locals, "request", None)
+
+
+class AuditlogMiddleware(HybridMiddleware, BaseAuditlogMiddleware):
+    """django-auditlog's AuditlogMiddleware, also under ASGI."""
+
+    def __init__(self, get_response):
+        BaseAuditlogMiddleware.__init__(self, get_response)
+        HybridMiddleware.__init__(self, get_response)
+
+    def call(self, request):
+        return BaseAuditlogMiddleware.__call__(self, request)
+
+    async def acall(self, request):
+        set_cid(request)
+        # `request.user` would load the user synchronously; `auser()` is the async lookup
+        user = await request.auser()
+        context_data = {
+            "remote_addr": self._get_remote_addr(request),
+            "remote_port": self._get_remote_port(request),
+            "actor": user if user.is_authenticated else None,
+        }
+        with set_extra_data(context_data=context_data):
+            return await self.get_response(request)
+
+
+class ProfileHandler(BaseHandler):
+    """A request handler running its own middleware list instead of MIDDLEWARE."""
+
+    def __init__(self, middleware, is_async=False):
+        self.middleware = middleware
+        self.load_middleware(is_async)
+
+    def load_middleware(self, is_async=False):
+        # BaseHandler.load_middleware() for `self.middleware` instead of settings.MIDDLEWARE
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        handler = convert_exception_to_response(self._get_response_async if is_async else self._get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(self.middleware):
+            middleware = import_string(middleware_path)
+            if not handler_is_async and getattr(middleware, "sync_capable", True):
+                middleware_is_async = False
+            else:
+                middleware_is_async = getattr(middleware, "async_capable", False)
+            try:
+                adapted_handler = self.adapt_method_mode(middleware_is_async, handler, handler_is_async)
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                continue
+            handler = adapted_handler
+
+            if hasattr(mw_instance, "process_view"):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, mw_instance.process_view))
+            if hasattr(mw_instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, mw_instance.process_template_response)
+                )
+            if hasattr(mw_instance, "process_exception"):
+                # Django's exception middleware stack is always synchronous
+                self._exception_middleware.append(self.adapt_method_mode(False, mw_instance.process_exception))
+            handler = convert_exception_to_response(mw_instance)
+            handler_is_async = middleware_is_async
+
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+
+class MiddlewareProfiles(HybridMiddleware):
+    """
+    Send requests under a `MIDDLEWARE_PROFILES` prefix through that profile's
+    middleware list instead of the rest of MIDDLEWARE.
+
+    `/api/` calls are JWT-authenticated JSON: they don't need static files, CSRF
+    cookies, messages, frame options or LoginRequiredMiddleware, which the web
+    pages do. MIDDLEWARE stays the complete web stack (and what Django's checks
+    see); middleware listed before this one runs for every request. The first
+    matching prefix wins, and a profile of `None` keeps its requests in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.profiles = [
+            (
+                prefix,
+                get_response
+                if middleware is None
+                else ProfileHandler(middleware, is_async=self.async_mode)._middleware_chain,
+            )
+            for prefix, middleware in settings.MIDDLEWARE_PROFILES.items()
+        ]
+
+    def get_chain(self, request):
+        for prefix, chain in self.profiles:
+            if request.path_info.startswith(prefix):
+                return chain
+        return self.get_response
+
+    def call(self, request):
+        return self.get_chain(request)(request)
+
+    async def acall(self, request):
+        return await self.get_chain(request)(request)
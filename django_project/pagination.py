@@ -0,0 +1,65 @@
+"""
+Paginators: DRF's page number pagination with an `apaginate_queryset()` for the
+async views in `django_project.async_views`, and a bounded-count paginator for
+admin changelists of large tables.
+"""
+
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset()` with the count and the page loaded by the async ORM."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # A cached_property: setting it keeps Paginator from counting synchronously
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc))) from exc
+
+        if paginator.num_pages > 1 and self.template is not None:
+            # The browsable API should display pagination controls.
+            self.display_page_controls = True
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return self.page.object_list
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count never scans more than `ADMIN_COUNT_LIMIT` rows.
+
+    An unfiltered table on PostgreSQL is counted from the planner's estimate
+    (`pg_class.reltuples`) once it is larger than the limit; anything else is
+    counted exactly up to the limit, so later pages of a huge result are not
+    reachable: narrow it down with search or filters instead.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = settings.ADMIN_COUNT_LIMIT
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.has_filters():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            # -1 until the table is first analyzed
+            if row and row[0] > limit:
+                return int(row[0])
+        return queryset.order_by()[:limit].count()
@@ -0,0 +1,53 @@
+"""
+Execute wrappers that follow a request into the threads running its queries.
+
+`connection.execute_wrapper()` only wraps the connection of the thread that installs
+it, and each thread has its own connections. Under ASGI, middleware runs on the
+event loop while the ORM runs in `sync_to_async` threads, so a wrapper installed by
+an async middleware never sees the request's queries. `request_wrapper()` keeps the
+wrapper in a context variable instead, which asgiref copies into those threads, and
+`run_wrappers()` is installed on every connection to call it.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_wrappers = ContextVar("query_wrappers", default=())
+
+
+def run_wrappers(execute, sql, params, many, context):
+    """Execute wrapper calling the wrappers of the current request, outermost first."""
+    for wrapper in reversed(_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install(connection):
+    if run_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.append(run_wrappers)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install(connection)
+
+
+@contextmanager
+def request_wrapper(wrapper):
+    """
+    Wrap the queries run in this context, whichever thread runs them, with `wrapper`
+    (a `connection.execute_wrapper()` callable).
+    """
+    # Connections this thread opened before this module was imported
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+    token = _wrappers.set((*_wrappers.get(), wrapper))
+    try:
+        yield wrapper
+    finally:
+        _wrappers.reset(token)
@@ -0,0 +1,52 @@
+"""
+JSON renderer backed by orjson when it is installed.
+
+orjson is an optional accelerator (`uv pip install orjson`). Without it, or for
+requests it can't serve (indented output, ASCII-only output), rendering falls back
+to DRF's stdlib-based renderer, so the output format is the same either way.
+"""
+
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# OPT_UTC_Z renders UTC datetimes with a "Z" suffix, matching DRF's encoder.
+# OPT_NON_STR_KEYS coerces int/UUID/... dict keys to strings like the stdlib does.
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """DRF's JSON encoder, extended with the value types used by our models."""
+
+    def default(self, obj):
+        if isinstance(obj, PhoneNumber):
+            return str(obj)
+        return super().default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    encoder_class = JSONEncoder
+
+    # `default()` holds no state, so one encoder instance serves every call
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            # orjson only supports two-space indentation; pretty output is not a hot path
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits: let the stdlib encoder handle (or report) them
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep DRF's guarantee that the output is a strict javascript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
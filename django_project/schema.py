@@ -0,0 +1,18 @@
+"""
+drf-spectacular extensions for the authentication classes of
+`django_project.authentication`.
+
+drf-spectacular matches its built-in schemes to simplejwt's and DRF's classes
+exactly, not their subclasses: without these the schema has no security schemes.
+"""
+
+from drf_spectacular.authentication import SessionScheme as BaseSessionScheme
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme as BaseSimpleJWTScheme
+
+
+class SimpleJWTScheme(BaseSimpleJWTScheme):
+    target_class = "django_project.authentication.JWTAuthentication"
+
+
+class SessionScheme(BaseSessionScheme):
+    target_class = "django_project.authentication.SessionAuthentication"
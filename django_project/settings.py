@@ -12,7 +12,6 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
-from dotenv import load_dotenv
 from environ import Env
 from loguru import logger
 
@@ -21,9 +20,9 @@ from django_project.permissions import GROUP_PERMISSIONS, PERMISSIONS  # noqa: F
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv()
-
 env = Env()
+# Variables already in the environment win over .env
+Env.read_env(BASE_DIR / ".env")
 
 
 # Quick-start development settings - unsuitable for production
@@ -38,6 +37,16 @@ DEBUG = env.bool("DEBUG", default=False)
 ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", default=["*"])
 
 
+# ============================ Optional features ============================
+# Optional apps are only installed, and imported at startup, when their flag is on.
+# allauth.socialaccount is not optional: dj_rest_auth.registration imports its models.
+# drf-spectacular OpenAPI schema and Swagger UI at /api/schema/ and /api/docs/
+ENABLE_API_DOCS = env.bool("ENABLE_API_DOCS", default=True)
+# smartmin syncs GROUP_PERMISSIONS to the database groups on every migrate
+ENABLE_SMARTMIN = env.bool("ENABLE_SMARTMIN", default=True)
+# allauth headless API at /_allauth/
+ENABLE_HEADLESS = env.bool("ENABLE_HEADLESS", default=True)
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -49,17 +58,14 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     # third party apps
     "django_extensions",
-    "smartmin",
     "author",
     "auditlog",
-    "drf_spectacular",
     "rest_framework",
     "rest_framework.authtoken",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
     "allauth",
     "allauth.account",
-    "allauth.headless",
     "allauth.socialaccount",
     "dj_rest_auth",
     "dj_rest_auth.registration",
@@ -69,9 +75,22 @@ INSTALLED_APPS = [
     "apps.accounts",
 ]
 
+if ENABLE_API_DOCS:
+    INSTALLED_APPS += ["drf_spectacular"]
+if ENABLE_SMARTMIN:
+    INSTALLED_APPS += ["smartmin"]
+if ENABLE_HEADLESS:
+    INSTALLED_APPS += ["allauth.headless"]
+
 MIDDLEWARE = [
+    "django_project.health.HealthCheckMiddleware",
+    "django_project.metrics.MetricsMiddleware",
+    "django_project.compression.CompressionMiddleware",
+    "django_project.timeouts.QueryTimeoutMiddleware",
+    # Requests matching MIDDLEWARE_PROFILES leave MIDDLEWARE here (see django_project.middleware)
+    "django_project.middleware.MiddlewareProfiles",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "django_project.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django_project.middleware.CustomCsrfViewMiddleware",
@@ -80,23 +99,60 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "allauth.account.middleware.AccountMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "author.middlewares.AuthorDefaultBackendMiddleware",
-    "auditlog.middleware.AuditlogMiddleware",
+    "django_project.middleware.AuthorMiddleware",
+    "django_project.middleware.AuditlogMiddleware",
+]
+
+# /api/ has no static files, only serves login_not_required DRF views and is never
+# framed. It stays CSRF exempt: CsrfExemptUrlsMiddleware marks CSRF_EXEMPT_URLS as
+# CustomCsrfViewMiddleware does, which also turns off DRF's check for session auth.
+# Sessions and auth stay for SessionAuthentication and dj-rest-auth's session login, messages and allauth for
+# the allauth flows behind registration, author/auditlog for created_by and audit records.
+API_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django_project.middleware.CsrfExemptUrlsMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "allauth.account.middleware.AccountMiddleware",
+    "django_project.middleware.AuthorMiddleware",
+    "django_project.middleware.AuditlogMiddleware",
 ]
 
+MIDDLEWARE_PROFILES = {
+    # The Swagger UI (and the schema it loads) is a browser page: keep frame options
+    "/api/docs/": None,
+    "/api/schema/": None,
+    "/api/": API_MIDDLEWARE,
+}
+
+# Fills created_by/updated_by from the request kept by django_project.middleware.AuthorMiddleware
+AUTHOR_BACKEND = "django_project.middleware.AuthorBackend"
+
 ROOT_URLCONF = "django_project.urls"
 
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            # Same lookup as APP_DIRS=True, with compiled templates kept in memory
+            # (still reloaded on change when DEBUG is on)
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
@@ -126,6 +182,19 @@ else:
         }
     }
 
+# ============================ Query timeouts ============================
+# Seconds any one query of a request may run, by path prefix (first match wins; 0 for
+# no limit). Cancelled queries answer 503 (see django_project.timeouts).
+QUERY_TIMEOUTS = {
+    "/api/": env.float("QUERY_TIMEOUT_API", default=2.0),
+    "/admin/": env.float("QUERY_TIMEOUT_ADMIN", default=10.0),
+}
+# Every other path
+QUERY_TIMEOUT = env.float("QUERY_TIMEOUT", default=5.0)
+QUERY_TIMEOUT_RETRY_AFTER = env.int("QUERY_TIMEOUT_RETRY_AFTER", default=5)
+# Queries at least this slow are logged
+SLOW_QUERY_SECONDS = env.float("SLOW_QUERY_SECONDS", default=1.0)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -198,32 +267,71 @@ REST_FRAMEWORK = {
     # Use Django's standard `django.contrib.auth` permissions,
     # or allow read-only access for unauthenticated users.
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    # simplejwt's and DRF's classes, with async versions for the async views
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
+        "django_project.authentication.JWTAuthentication",
+        "django_project.authentication.SessionAuthentication",
+    ],
+    # orjson-backed JSON when installed, DRF's stdlib renderer/parser otherwise
+    "DEFAULT_RENDERER_CLASSES": [
+        "django_project.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PARSER_CLASSES": [
+        "django_project.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "django_project.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Token-bucket throttles for views with a `throttle_scope`, see django_project/throttling.py
+    "DEFAULT_THROTTLE_CLASSES": ["django_project.throttling.ScopedTokenBucketThrottle"],
+    # Proxies in front of the app whose X-Forwarded-For is trusted for the client IP.
+    # Unset, throttles key on REMOTE_ADDR (behind a proxy: every client shares its address).
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=None),
+    "DEFAULT_THROTTLE_RATES": {
+        "login": env.str("THROTTLE_RATE_LOGIN", default="10/min"),
+        "registration": env.str("THROTTLE_RATE_REGISTRATION", default="5/min"),
+        "password_reset": env.str("THROTTLE_RATE_PASSWORD_RESET", default="5/hour"),
+    },
 }
 
+# Cache alias holding the throttle buckets so all workers share them.
+# Leave unset to keep the buckets in each process's memory.
+THROTTLE_CACHE = env.str("THROTTLE_CACHE", default=None)
+
 # ===================================== Allauth/dj-rest-auth/simplejwt settings =====================================
 # https://docs.allauth.org/en/latest/index.html
 # https://dj-rest-auth.readthedocs.io/en/latest/installation.html
 # https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html
 AUTHENTICATION_BACKENDS = [
-    # Needed to login by username in Django admin, regardless of `allauth`
-    "django.contrib.auth.backends.ModelBackend",
+    # Needed to login by username in Django admin, regardless of `allauth`.
+    # ModelBackend with permission sets cached across requests
+    "apps.users.backends.CachedModelBackend",
     # `allauth` specific authentication methods, such as login by email
     "allauth.account.auth_backends.AuthenticationBackend",
 ]
 
+# Cache alias holding users' resolved permission sets. Changes only invalidate the sets
+# in that cache, so with the default per-process cache other workers may keep a revoked
+# permission for up to PERMISSION_CACHE_TIMEOUT seconds: share it (e.g. Redis) before raising that.
+PERMISSION_CACHE = env.str("PERMISSION_CACHE", default="default")
+PERMISSION_CACHE_TIMEOUT = env.int("PERMISSION_CACHE_TIMEOUT", default=5)
+
 ACCOUNT_LOGIN_METHODS = {"email"}
 ACCOUNT_SIGNUP_FIELDS = ["username", "email*", "password1*", "password2*"]
 ACCOUNT_EMAIL_VERIFICATION = "optional"
 ACCOUNT_USER_MODEL_EMAIL_FIELD = "email"
 ACCOUNT_UNIQUE_EMAIL = True
 ACCOUNT_LOGOUT_ON_GET = False
+# Lists social apps from a per-process copy instead of querying them on every request
+SOCIALACCOUNT_ADAPTER = "apps.accounts.social.SocialAccountAdapter"
+# Cache alias holding the version of the social apps each process keeps in memory. A
+# change only bumps the version in that cache, so with the default per-process cache
+# other workers list the old apps for up to SOCIALACCOUNT_APP_CACHE_TIMEOUT seconds:
+# share it (e.g. Redis) before raising that, or setting 0 (no expiry).
+SOCIALACCOUNT_APP_CACHE = env.str("SOCIALACCOUNT_APP_CACHE", default="default")
+SOCIALACCOUNT_APP_CACHE_TIMEOUT = env.int("SOCIALACCOUNT_APP_CACHE_TIMEOUT", default=5)
 REST_AUTH = {
     "LOGIN_SERIALIZER": "apps.api.accounts.serializers.LoginSerializer",
     "USE_JWT": True,
@@ -237,6 +345,9 @@ REST_AUTH = {
 SITE_ID = 1
 
 # ============================ Spectacular ============================
+if ENABLE_API_DOCS:
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = "drf_spectacular.openapi.AutoSchema"
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Shirobase API",
     "DESCRIPTION": "API for Shirobase",
@@ -244,6 +355,69 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# ============================ Metrics ============================
+# Served at /metrics in the Prometheus text format. With several worker processes,
+# METRICS_DIR must point to a directory shared by all of them (emptied on deploy).
+METRICS_DIR = env.str("METRICS_DIR", default=None)
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=1.0)
+# Scrapes must send "Authorization: Bearer <token>". Unset, /metrics is only served when DEBUG is on.
+METRICS_TOKEN = env.str("METRICS_TOKEN", default=None)
+
+# ============================ Health checks ============================
+# How long /readyz reuses its last result, so probes don't pile load onto the database
+HEALTH_CHECK_CACHE_SECONDS = env.int("HEALTH_CHECK_CACHE_SECONDS", default=5)
+
+# ============================ Page caching ============================
+# Whole-page cache for anonymous visitors of public pages (see django_project.caching)
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", default=300)
+# Per-user fragments, keyed by the user's and profile's modification times
+FRAGMENT_CACHE_TIMEOUT = env.int("FRAGMENT_CACHE_TIMEOUT", default=600)
+
+# ============================ Compression ============================
+# gzip, or brotli when the brotli package is installed (see django_project.compression)
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=500)
+COMPRESSION_BROTLI_QUALITY = env.int("COMPRESSION_BROTLI_QUALITY", default=4)
+
+# ============================ Audit log ============================
+# Only these fields are diffed and logged (see apps.users.audit)
+AUDITLOG_INCLUDE_TRACKING_MODELS = (
+    {
+        "model": "users.User",
+        "include_fields": [
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "is_active",
+            "is_staff",
+            "is_superuser",
+        ],
+    },
+    {"model": "users.Profile", "include_fields": ["phone"]},
+)
+# archive_auditlog archives and deletes entries older than this
+AUDITLOG_RETENTION_DAYS = env.int("AUDITLOG_RETENTION_DAYS", default=365)
+# Where archive_auditlog writes its gzipped JSONL files
+AUDITLOG_ARCHIVE_DIR = env.str("AUDITLOG_ARCHIVE_DIR", default=None)
+
+# ============================ Last login ============================
+# Logins within this many seconds of the stored last_login don't write it again.
+# Both settings delay or skip the invalidation of password reset tokens by a login
+# (see apps.users.last_login), so they are off by default.
+LAST_LOGIN_PRECISION = env.int("LAST_LOGIN_PRECISION", default=0)
+# 0 writes last_login during the login; otherwise it is buffered and written in
+# bulk at most this many seconds later (see apps.users.last_login)
+LAST_LOGIN_FLUSH_INTERVAL = env.float("LAST_LOGIN_FLUSH_INTERVAL", default=0)
+
+# ============================ User delta sync ============================
+# Changes younger than this wait for the next call, so transactions still open
+# when the feed is read can't commit behind a consumer's watermark
+USER_CHANGES_SETTLE_SECONDS = env.int("USER_CHANGES_SETTLE_SECONDS", default=5)
+
+# ============================ Admin ============================
+# Changelist counts stop at this many rows (PostgreSQL estimates unfiltered tables)
+ADMIN_COUNT_LIMIT = env.int("ADMIN_COUNT_LIMIT", default=10000)
+
 # ===================================== Email settings =====================================
 # https://docs.djangoproject.com/en/5.1/topics/email/
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
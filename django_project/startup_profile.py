@@ -0,0 +1,72 @@
+"""
+Time each phase of a cold start: settings, every app's import, models and ready(),
+the URLconf and the WSGI handler (middleware).
+
+Run in a fresh interpreter by `manage.py profile_startup`, which also passes
+`-X importtime`; prints the timings as JSON on stdout. Nothing Django is imported
+at module level so the measurements start from a clean slate.
+"""
+
+import json
+import time
+from importlib import import_module
+
+timings = {"phases": {}, "apps": {}}
+
+
+def timed(app_label, step, method):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings["apps"][app_label][step] = time.perf_counter() - started
+
+    return wrapper
+
+
+def instrument_app_configs():
+    from django.apps import AppConfig
+
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        started = time.perf_counter()
+        app_config = create(cls, entry)
+        timings["apps"][app_config.label] = {"name": app_config.name, "import": time.perf_counter() - started}
+        app_config.import_models = timed(app_config.label, "models", app_config.import_models)
+        app_config.ready = timed(app_config.label, "ready", app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+
+
+def phase(name, func):
+    started = time.perf_counter()
+    func()
+    timings["phases"][name] = time.perf_counter() - started
+
+
+def main():
+    started = time.perf_counter()
+    phase("django", lambda: import_module("django.apps"))
+    instrument_app_configs()
+
+    from django.conf import settings
+
+    phase("settings", lambda: settings.INSTALLED_APPS)
+
+    import django
+
+    phase("apps", django.setup)
+    phase("urlconf", lambda: import_module(settings.ROOT_URLCONF))
+
+    from django.core.handlers.wsgi import WSGIHandler
+
+    phase("middleware", WSGIHandler)
+    timings["total"] = time.perf_counter() - started
+    print(json.dumps(timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.models import Profile
+from django_project.middleware import MiddlewareProfiles, ProfileHandler
+
+User = get_user_model()
+
+
+class AsyncMiddlewareTests(SimpleTestCase):
+    """Test cases for the middleware under ASGI"""
+
+    def test_middleware_is_async_capable(self):
+        """Test that no middleware makes Django run the stack above it synchronously"""
+        for path in [*settings.MIDDLEWARE, *settings.API_MIDDLEWARE]:
+            with self.subTest(path):
+                self.assertTrue(getattr(import_string(path), "async_capable", False))
+
+    def test_api_profile_runs_async(self):
+        """Test that the /api/ profile builds an async chain when the handler is async"""
+
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(MiddlewareProfiles(get_response)))
+        self.assertTrue(iscoroutinefunction(ProfileHandler(settings.API_MIDDLEWARE, is_async=True)._middleware_chain))
+        self.assertFalse(iscoroutinefunction(MiddlewareProfiles(lambda request: HttpResponse())))
+
+
+class AsyncAPIViewTests(TestCase):
+    """Test cases for the async user endpoints under ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="jane", email="jane@example.com", password="testpass123")
+        cls.user.groups.add(Group.objects.create(name="staff"))
+        cls.other = User.objects.create_user(username="john", email="john@example.com", password="testpass123")
+
+    def setUp(self):
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    async def test_current_user_with_jwt(self):
+        """Test that the current user endpoint authenticates the JWT asynchronously"""
+        response = await self.async_client.get(reverse("accounts:user_details"), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "jane")
+
+    async def test_current_user_requires_authentication(self):
+        """Test that anonymous requests are rejected"""
+        response = await self.async_client.get(reverse("accounts:user_details"))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_current_user_with_session(self):
+        """Test that session authentication works asynchronously"""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("accounts:user_details"))
+        self.assertEqual(response.json()["email"], "jane@example.com")
+
+    async def test_update_current_user(self):
+        """Test that writes still go through the serializer and keep the author"""
+        response = await self.async_client.patch(
+            reverse("accounts:user_details"),
+            {"first_name": "Jane"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        user = await User.objects.select_related("updated_by").aget(pk=self.user.pk)
+        self.assertEqual(user.first_name, "Jane")
+        self.assertEqual(user.updated_by, self.user)
+
+    async def test_unchanged_update_does_not_write(self):
+        """Test that a PATCH repeating the current values doesn't touch the row"""
+        response = await self.async_client.patch(
+            reverse("accounts:user_details"),
+            {"username": "jane", "email": "jane@example.com"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertEqual(user.modified, self.user.modified)
+
+    async def test_user_list(self):
+        """Test that the user list is paginated with the async ORM"""
+        response = await self.async_client.get(reverse("users:users-list"), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["count"], 2)
+        self.assertEqual([user["username"] for user in data["results"]], ["jane", "john"])
+        self.assertEqual(len(data["results"][0]["groups"]), 1)
+
+    async def test_user_list_search(self):
+        """Test that ?search= returns full-text matches, best first"""
+        await User.objects.acreate(username="johnson", email="j@example.org", first_name="John")
+        response = await self.async_client.get(reverse("users:users-list"), {"search": "john"}, headers=self.headers)
+        self.assertCountEqual([user["username"] for user in response.json()["results"]], ["john", "johnson"])
+
+    async def test_user_list_invalid_page(self):
+        """Test that a page past the end is a 404"""
+        response = await self.async_client.get(reverse("users:users-list"), {"page": 9}, headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_user_retrieve(self):
+        """Test that a user is retrieved, and unknown ids are a 404"""
+        response = await self.async_client.get(
+            reverse("users:users-detail", args=[self.other.pk]), headers=self.headers
+        )
+        self.assertEqual(response.json()["username"], "john")
+        response = await self.async_client.get(reverse("users:users-detail", args=["nope"]), headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_profile_page(self):
+        """Test that the profile page renders asynchronously, and requires login"""
+        await Profile.objects.acreate(user=self.user, phone="+256781435857")
+        response = await self.async_client.get(reverse("account_profile"))
+        self.assertEqual(response.status_code, 302)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("account_profile"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["profile"].user_id, self.user.pk)
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import translation
+
+from django_project.caching import cache_anonymous_page
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+    """Test cases for whole-page caching of public pages"""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("index")
+
+    def test_anonymous_page_is_cached(self):
+        """Test that the second anonymous visit is served from the cache"""
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertTemplateUsed(first, "index.html")
+        self.assertTemplateNotUsed(second, "index.html")
+        self.assertContains(second, "Django Web Application Starter")
+
+    def test_authenticated_users_get_a_fresh_page(self):
+        """Test that the cached anonymous page is never served to signed-in users"""
+        self.client.get(self.url)
+        User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(username="testuser", password="testpass123")
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, "index.html")
+        self.assertContains(response, "Logout")
+
+    def test_query_strings_bypass_the_cache(self):
+        """Test that arbitrary query strings don't create cache entries"""
+        self.client.get(self.url)
+        self.assertTemplateUsed(self.client.get(self.url, {"utm": "x"}), "index.html")
+
+    def test_pages_are_cached_per_host_and_language(self):
+        """Test that another host or language doesn't get the page cached for the first one"""
+
+        @cache_anonymous_page
+        def view(request):
+            return HttpResponse(f"{request.get_host()} {translation.get_language()}")
+
+        def get(host):
+            request = RequestFactory().get("/", HTTP_HOST=host)
+            request.user = AnonymousUser()
+            return view(request).content.decode()
+
+        self.assertEqual(get("localhost"), "localhost en-us")
+        self.assertEqual(get("testserver"), "testserver en-us")
+        with translation.override("fr"):
+            self.assertEqual(get("localhost"), "localhost fr")
+        self.assertEqual(get("localhost"), "localhost en-us")
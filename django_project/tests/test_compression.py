@@ -0,0 +1,125 @@
+import gzip
+from unittest import mock, skipIf
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from django_project import compression
+from django_project.compression import CompressionMiddleware, negotiate
+from django_project.metrics import registry
+
+User = get_user_model()
+
+BODY = b"shirobase " * 200
+
+
+class NegotiationTests(SimpleTestCase):
+    """Test cases for Accept-Encoding negotiation"""
+
+    @skipIf(compression.brotli is None, "brotli is not installed")
+    def test_prefers_brotli(self):
+        """Test that brotli wins over gzip when both are accepted"""
+        self.assertEqual(negotiate("gzip, deflate, br"), "br")
+
+    def test_quality_values(self):
+        """Test that q-values, including q=0 and wildcards, are honoured"""
+        self.assertEqual(negotiate("gzip;q=1.0, br;q=0.5"), "gzip")
+        self.assertEqual(negotiate("br;q=0, *"), "gzip")
+        self.assertIsNone(negotiate("identity"))
+        self.assertIsNone(negotiate(""))
+
+    def test_gzip_only_without_brotli(self):
+        """Test that gzip is used when the brotli package is missing"""
+        with mock.patch.object(compression, "brotli", None):
+            self.assertEqual(negotiate("br, gzip"), "gzip")
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test cases for CompressionMiddleware"""
+
+    def setUp(self):
+        self.request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+
+    def process(self, response, request=None):
+        return CompressionMiddleware(lambda request: response)(request or self.request)
+
+    def test_compresses_large_responses(self):
+        """Test that large bodies are gzipped with Vary and Content-Length set"""
+        response = self.process(HttpResponse(BODY))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+
+    @skipIf(compression.brotli is None, "brotli is not installed")
+    def test_brotli(self):
+        """Test that brotli is used when negotiated"""
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="br")
+        response = self.process(HttpResponse(BODY), request)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(response.content), BODY)
+
+    @override_settings(COMPRESSION_MIN_SIZE=4096)
+    def test_small_responses_are_not_compressed(self):
+        """Test that bodies under COMPRESSION_MIN_SIZE are sent as is"""
+        response = self.process(HttpResponse(BODY))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_compressed_content_types_are_skipped(self):
+        """Test that already-compressed payloads are not compressed again"""
+        response = self.process(HttpResponse(BODY, content_type="application/gzip"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_no_compression_views_are_skipped(self):
+        """Test that responses marked no_compression are sent as is"""
+        view = compression.no_compression(lambda request: HttpResponse(BODY))
+        response = CompressionMiddleware(view)(self.request)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_streaming_responses(self):
+        """Test that streamed bodies are compressed incrementally and counted"""
+        before = registry.value("http_response_compression_bytes_total", encoding="gzip", stage="in")
+        response = self.process(StreamingHttpResponse(BODY[i : i + 100] for i in range(0, len(BODY), 100)))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), BODY)
+        after = registry.value("http_response_compression_bytes_total", encoding="gzip", stage="in")
+        self.assertEqual(after - before, len(BODY))
+
+    def test_streaming_gzip_header_has_random_length(self):
+        """Test that streamed gzip bodies get the random-length header of non-streaming ones (BREACH)"""
+        lengths = set()
+        for _ in range(10):
+            response = self.process(StreamingHttpResponse(iter([BODY])))
+            content = b"".join(response.streaming_content)
+            self.assertEqual(gzip.decompress(content), BODY)
+            self.assertEqual(content[3], gzip.FNAME)
+            lengths.add(len(content))
+        self.assertGreater(len(lengths), 1)
+
+    def test_empty_streams_are_valid_gzip(self):
+        """Test that a stream without chunks still compresses to a complete gzip body"""
+        response = self.process(StreamingHttpResponse(iter([])))
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), b"")
+
+    def test_strong_etag_is_weakened(self):
+        """Test that a strong ETag becomes weak once the body is encoded"""
+        original = HttpResponse(BODY)
+        original["ETag"] = '"abc"'
+        self.assertEqual(self.process(original)["ETag"], 'W/"abc"')
+
+
+class TokenResponseTests(APITestCase):
+    """Test cases for compression of the auth endpoints"""
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_login_response_is_not_compressed(self):
+        """Test that responses carrying JWTs are never compressed"""
+        User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        data = {"email": "test@example.com", "password": "testpass123"}
+        response = self.client.post(reverse("accounts:login"), data, format="json", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from django_project import health
+
+
+class HealthCheckTests(TestCase):
+    """Test cases for the liveness and readiness probes"""
+
+    def setUp(self):
+        health.reset()
+
+    def test_liveness_skips_the_middleware_stack(self):
+        """Test that /healthz answers without queries, cookies or host validation"""
+        with self.assertNumQueries(0):
+            response = self.client.get("/healthz", HTTP_HOST="10.0.0.5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ok"})
+        self.assertFalse(response.cookies)
+
+    @override_settings(ALLOWED_HOSTS=["example.com"])
+    def test_readiness_reports_each_check(self):
+        """Test that /readyz checks the database, cache and migrations"""
+        response = self.client.get("/readyz", HTTP_HOST="10.0.0.5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["checks"], {"database": "ok", "cache": "ok", "migrations": "ok"})
+
+    def test_readiness_result_is_cached(self):
+        """Test that probes within the cache interval reuse the last result"""
+        self.client.get("/readyz")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/readyz").status_code, 200)
+
+    @override_settings(HEALTH_CHECK_CACHE_SECONDS=0)
+    def test_migrations_are_checked_once(self):
+        """Test that later probes only ping the database once migrations are applied"""
+        self.client.get("/readyz")
+        with self.assertNumQueries(1):
+            self.client.get("/readyz")
+
+    def test_failing_check_returns_503(self):
+        """Test that an unreachable dependency makes the instance unready"""
+        with mock.patch.dict(health.CHECKS, {"cache": mock.Mock(side_effect=ConnectionError("refused"))}):
+            response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "unavailable")
+        self.assertEqual(response.json()["checks"]["cache"], "refused")
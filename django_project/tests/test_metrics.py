@@ -0,0 +1,131 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from django_project.metrics import collect, metrics_view, registry, render
+
+User = get_user_model()
+
+# The users list's URL pattern, as DRF's router writes it
+USERS_ROUTE = "api/users/users/$"
+
+
+class RenderTests(SimpleTestCase):
+    """Test cases for the exposition format"""
+
+    def test_counters_and_histograms(self):
+        """Test that histograms are rendered with cumulative buckets, sum and count"""
+        counters = {("hits_total", (("route", 'a"b'),)): 3}
+        histograms = {("latency_seconds", ()): [[0.1, 1.0], [1, 2, 1], 2.5, 4]}
+        self.assertEqual(
+            render(counters, histograms),
+            "# TYPE hits_total counter\n"
+            'hits_total{route="a\\"b"} 3\n'
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{le="0.1"} 1\n'
+            'latency_seconds_bucket{le="1.0"} 3\n'
+            'latency_seconds_bucket{le="+Inf"} 4\n'
+            "latency_seconds_sum 2.5\n"
+            "latency_seconds_count 4\n",
+        )
+
+
+class CollectTests(SimpleTestCase):
+    """Test cases for aggregating the snapshots of several processes"""
+
+    def test_snapshots_of_other_processes_are_added(self):
+        """Test that counters and histograms of flushed processes are summed with the live ones"""
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            registry.flush(force=True)
+            own = registry.value("test_total", worker="x")
+            registry.inc("test_total", worker="x")
+            other = {
+                "counters": [["test_total", [["worker", "x"]], 2]],
+                "histograms": [["test_seconds", [], [0.1], [1, 1], 0.6, 2]],
+            }
+            Path(directory, "1-1.json").write_text(json.dumps(other))
+
+            counters, histograms = collect()
+            self.assertEqual(counters[("test_total", (("worker", "x"),))], own + 3)
+            self.assertEqual(histograms[("test_seconds", ())], [[0.1], [1, 1], 0.6, 2])
+
+
+class MetricsEndpointTests(APITestCase):
+    """Test cases for the metrics middleware and endpoint"""
+
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    def test_requests_are_recorded_per_route(self):
+        """Test that status, latency and query counts are labelled with the URL pattern"""
+        self.client.force_authenticate(self.user)
+        labels = {"method": "GET", "route": USERS_ROUTE}
+
+        self.client.get(reverse("users:users-list"))
+
+        self.assertEqual(registry.value("django_http_requests_total", status=200, **labels), 1)
+        self.assertGreater(registry.value("django_db_queries_total", route=USERS_ROUTE), 0)
+        with override_settings(METRICS_TOKEN="secret"):
+            body = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret").content.decode()
+        self.assertIn('django_http_request_duration_seconds_bucket{method="GET",route="api/users/users/$",le=', body)
+        self.assertIn('django_db_queries_total{route="api/users/users/$"}', body)
+
+    async def test_queries_are_counted_under_asgi(self):
+        """Test that queries the ORM runs in sync_to_async threads are counted for the route"""
+        response = await self.async_client.get(reverse("users:users-list"), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(registry.value("django_db_queries_total", route=USERS_ROUTE), 0)
+
+    def test_unmatched_paths_share_a_label(self):
+        """Test that 404s for arbitrary paths do not create new series"""
+        self.client.get("/no-such-page-1/")
+        self.client.get("/no-such-page-2/")
+        self.assertEqual(registry.value("django_http_requests_total", method="GET", route="<unmatched>", status=404), 2)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required_when_configured(self):
+        """Test that scrapes need the bearer token when METRICS_TOKEN is set"""
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    def test_endpoint_is_closed_without_a_token(self):
+        """Test that without METRICS_TOKEN metrics are only served when DEBUG is on"""
+        request = RequestFactory().get("/metrics")
+        with override_settings(DEBUG=False):
+            self.assertEqual(metrics_view(request).status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(metrics_view(request).status_code, 200)
+
+
+class AuthEventTests(TestCase):
+    """Test cases for the authentication counters"""
+
+    def test_login_and_failed_login_are_counted(self):
+        """Test that successful and failed logins increment their counters"""
+        User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        logins = registry.value("auth_events_total", event="login")
+        failures = registry.value("auth_events_total", event="login_failed")
+
+        self.client.login(username="testuser", password="testpass123")
+        self.client.login(username="testuser", password="wrong")
+
+        self.assertEqual(registry.value("auth_events_total", event="login"), logins + 1)
+        self.assertEqual(registry.value("auth_events_total", event="login_failed"), failures + 1)
+
+    def test_registration_is_counted(self):
+        """Test that API registrations increment the signup counter"""
+        signups = registry.value("auth_events_total", event="signup")
+        data = {"email": "new@example.com", "password1": "Complex-pass-123", "password2": "Complex-pass-123"}
+        response = self.client.post(reverse("accounts:rest_register"), data, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(registry.value("auth_events_total", event="signup"), signups + 1)
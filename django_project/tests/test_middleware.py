@@ -0,0 +1,63 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+User = get_user_model()
+
+
+class MiddlewareProfilesTests(APITestCase):
+    """Test cases for the /api/ middleware profile"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+
+    def test_api_requests_skip_web_only_middleware(self):
+        """Test that /api/ responses don't go through XFrameOptionsMiddleware"""
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("accounts:user_details"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("X-Frame-Options"))
+
+    @override_settings(MIDDLEWARE_PROFILES={})
+    def test_without_profiles_the_full_stack_runs(self):
+        """Test that an empty MIDDLEWARE_PROFILES runs MIDDLEWARE for every request"""
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("accounts:user_details"))
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+    @skipUnless(settings.ENABLE_API_DOCS, "API docs are disabled")
+    def test_api_docs_run_the_full_stack(self):
+        """Test that the Swagger UI under /api/ can still not be framed"""
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("swagger-ui"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+    def test_session_writes_stay_csrf_exempt(self):
+        """Test that session-authenticated API writes still need no CSRF token"""
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.patch(reverse("accounts:user_details"), {"first_name": "Test"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_api_writes_keep_the_author(self):
+        """Test that author tracking still sees the API user"""
+        self.client.force_authenticate(self.user)
+        self.client.patch(reverse("accounts:user_details"), {"first_name": "Test"}, format="json")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Test")
+        self.assertEqual(self.user.updated_by, self.user)
+
+
+class WebMiddlewareTests(TestCase):
+    """Test cases for requests outside the profiles"""
+
+    def test_web_pages_run_the_full_stack(self):
+        """Test that web pages still get frame options and login redirects"""
+        response = self.client.get(reverse("account_profile"))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["X-Frame-Options"], "DENY")
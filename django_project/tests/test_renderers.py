@@ -0,0 +1,92 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.exceptions import ParseError
+
+from django_project import parsers, renderers
+from django_project.parsers import JSONParser
+from django_project.renderers import JSONRenderer
+
+PAYLOAD = {
+    "id": 1,
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "balance": decimal.Decimal("10.50"),
+    "joined": datetime.datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.UTC),
+    "birthday": datetime.date(1990, 5, 17),
+    "phone": PhoneNumber.from_string("+256781435857"),
+    "name": "Jöhn \u2028",
+    "tags": ("a", "b"),
+    7: "int key",
+}
+
+
+class JSONRendererTests(SimpleTestCase):
+    """Test cases for the orjson-backed JSONRenderer"""
+
+    def render(self, data, accepted_media_type=None):
+        return JSONRenderer().render(data, accepted_media_type)
+
+    def test_renders_model_value_types(self):
+        """Test that datetimes, UUIDs, decimals and phone numbers render like DRF"""
+        data = json.loads(self.render(PAYLOAD))
+        self.assertEqual(data["uuid"], "12345678-1234-5678-1234-567812345678")
+        self.assertEqual(data["balance"], 10.5)
+        self.assertEqual(data["joined"], "2025-01-02T03:04:05.678000Z")
+        self.assertEqual(data["birthday"], "1990-05-17")
+        self.assertEqual(data["phone"], "+256781435857")
+        self.assertEqual(data["name"], "Jöhn \u2028")
+        self.assertEqual(data["tags"], ["a", "b"])
+        self.assertEqual(data["7"], "int key")
+
+    def test_escapes_line_separators(self):
+        """Test that U+2028 is escaped so the output is a strict javascript subset"""
+        self.assertIn(b"\\u2028", self.render({"name": "\u2028"}))
+
+    def test_accelerated_output_matches_stdlib_output(self):
+        """Test that the orjson and stdlib code paths produce the same JSON"""
+        accelerated = json.loads(self.render(PAYLOAD))
+        with mock.patch.object(renderers, "orjson", None):
+            fallback = json.loads(self.render(PAYLOAD))
+        self.assertEqual(accelerated, fallback)
+
+    def test_indented_output(self):
+        """Test that indentation requested by the client is honoured"""
+        self.assertIn(b'\n    "id": 1', self.render({"id": 1}, "application/json; indent=4"))
+
+    def test_none_renders_empty(self):
+        """Test that None renders to an empty body"""
+        self.assertEqual(self.render(None), b"")
+
+    @skipIf(renderers.orjson is None, "orjson is not installed")
+    def test_falls_back_for_values_orjson_cannot_encode(self):
+        """Test that integers wider than 64 bits are rendered by the stdlib encoder"""
+        self.assertEqual(self.render({"big": 2**70}), b'{"big":1180591620717411303424}')
+
+
+class JSONParserTests(SimpleTestCase):
+    """Test cases for the orjson-backed JSONParser"""
+
+    def parse(self, content):
+        return JSONParser().parse(io.BytesIO(content), "application/json", {"encoding": "utf-8"})
+
+    def test_parses_json(self):
+        """Test that a JSON body is parsed"""
+        self.assertEqual(self.parse(b'{"email": "j\xc3\xb6hn@example.com"}'), {"email": "jöhn@example.com"})
+
+    def test_invalid_json_raises_parse_error(self):
+        """Test that malformed JSON raises a ParseError"""
+        with self.assertRaises(ParseError):
+            self.parse(b'{"email": ')
+
+    def test_nan_is_rejected(self):
+        """Test that NaN is rejected like DRF's strict parser does"""
+        with self.assertRaises(ParseError):
+            self.parse(b'{"value": NaN}')
+        with mock.patch.object(parsers, "orjson", None), self.assertRaises(ParseError):
+            self.parse(b'{"value": NaN}')
@@ -0,0 +1,21 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+
+
+@skipUnless(settings.ENABLE_API_DOCS, "API docs are disabled")
+class SchemaTests(TestCase):
+    """Test cases for the generated OpenAPI schema"""
+
+    def test_schema_documents_the_authentication_classes(self):
+        """Test that the async-capable authentication classes keep their security schemes"""
+        response = self.client.get(reverse("schema"), HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 200)
+        schema = response.json()
+        self.assertEqual(set(schema["components"]["securitySchemes"]), {"jwtAuth", "cookieAuth"})
+        operation = schema["paths"]["/api/accounts/user/"]["get"]
+        self.assertEqual(
+            {name for requirement in operation["security"] for name in requirement}, {"jwtAuth", "cookieAuth"}
+        )
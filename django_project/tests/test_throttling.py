@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from django_project import throttling
+from django_project.metrics import registry
+from django_project.throttling import LocalBucketStore, parse_rate, take_token
+
+
+def throttle_rates(num_proxies=None, **rates):
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates, "NUM_PROXIES": num_proxies}
+    )
+
+
+class TokenBucketTests(SimpleTestCase):
+    """Test cases for the token bucket primitives"""
+
+    def test_parse_rate(self):
+        """Test that DRF-style rates become a capacity and a refill rate"""
+        self.assertEqual(parse_rate("10/min"), (10, 10 / 60))
+        self.assertEqual(parse_rate("5/hour"), (5, 5 / 3600))
+
+    def test_take_token_until_empty_then_refill(self):
+        """Test that a bucket empties, reports the wait and refills over time"""
+        state = None
+        for _ in range(2):
+            state, wait = take_token(state, 100.0, capacity=2, refill_rate=1.0)
+            self.assertEqual(wait, 0)
+
+        state, wait = take_token(state, 100.0, capacity=2, refill_rate=1.0)
+        self.assertEqual(wait, 1.0)
+
+        # Half a second later half a token has been refilled
+        state, wait = take_token(state, 100.5, capacity=2, refill_rate=1.0)
+        self.assertEqual(wait, 0.5)
+
+        state, wait = take_token(state, 101.0, capacity=2, refill_rate=1.0)
+        self.assertEqual(wait, 0)
+
+    def test_local_store_evicts_least_recently_used_key(self):
+        """Test that the in-process store stays bounded"""
+        store = LocalBucketStore(max_keys=2)
+        store.consume("a", 1, 1.0)
+        store.consume("b", 1, 1.0)
+        store.consume("a", 1, 1.0)
+        store.consume("c", 1, 1.0)
+        self.assertEqual(list(store._buckets), ["a", "c"])
+
+
+class ScopedThrottleEndpointTests(APITestCase):
+    """Test cases for throttling of the account endpoints"""
+
+    def setUp(self):
+        throttling.get_store().clear()
+        self.url = reverse("accounts:login")
+        self.data = {"email": "nobody@email.com", "password": "wrong"}
+
+    @throttle_rates(login="2/min")
+    def test_login_is_throttled_with_retry_after(self):
+        """Test that bursts beyond the login rate get a 429 with Retry-After"""
+        rejected = registry.value("api_throttled_requests_total", scope="login")
+        for _ in range(2):
+            response = self.client.post(self.url, self.data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # One token refills every 30 seconds
+        self.assertIn(int(response["Retry-After"]), range(1, 31))
+        self.assertEqual(registry.value("api_throttled_requests_total", scope="login"), rejected + 1)
+
+    @throttle_rates(login="1/min")
+    def test_scopes_are_throttled_independently(self):
+        """Test that exhausting one scope does not affect another"""
+        self.client.post(self.url, self.data, format="json")
+        response = self.client.post(self.url, self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self.client.post(reverse("accounts:password_reset"), {"email": "nobody@email.com"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @throttle_rates(login="2/min")
+    def test_spoofed_forwarded_for_does_not_reset_the_bucket(self):
+        """Test that without NUM_PROXIES a new X-Forwarded-For per request is ignored"""
+        for i in range(2):
+            data = {**self.data, "email": f"nobody{i}@email.com"}
+            response = self.client.post(self.url, data, format="json", HTTP_X_FORWARDED_FOR=f"10.0.0.{i}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data = {**self.data, "email": "nobody2@email.com"}
+        response = self.client.post(self.url, data, format="json", HTTP_X_FORWARDED_FOR="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @throttle_rates(num_proxies=1, login="2/min")
+    def test_login_is_throttled_per_account(self):
+        """Test that attempts on one account from many addresses share its bucket"""
+        for i in range(2):
+            response = self.client.post(self.url, self.data, format="json", HTTP_X_FORWARDED_FOR=f"10.0.0.{i}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url, {**self.data, "email": "NOBODY@email.com"}, format="json", HTTP_X_FORWARDED_FOR="10.0.0.2"
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # Behind the trusted proxy, another client and account is unaffected
+        data = {**self.data, "email": "other@email.com"}
+        response = self.client.post(self.url, data, format="json", HTTP_X_FORWARDED_FOR="10.0.0.3")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,99 @@
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+
+from django_project.timeouts import QueryBudget, QueryTimeout, QueryTimeoutMiddleware, budget_for
+
+# Counts to 100 million: seconds of work for SQLite
+SLOW_QUERY = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) SELECT count(*) FROM c"
+)
+
+
+def slow_view(request):
+    with connection.cursor() as cursor:
+        cursor.execute(SLOW_QUERY)
+    return HttpResponse("done")
+
+
+async def async_slow_view(request):
+    # As under ASGI: the middleware runs on the event loop, the query in a thread
+    return await sync_to_async(slow_view)(request)
+
+
+def fast_view(request):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return HttpResponse("done")
+
+
+@override_settings(QUERY_TIMEOUTS={"/api/": 0.05, "/admin/": 0}, QUERY_TIMEOUT=0.1, QUERY_TIMEOUT_RETRY_AFTER=3)
+class QueryTimeoutTests(TestCase):
+    """Test cases for per-route query timeouts"""
+
+    def setUp(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Interrupting a query is tested on SQLite")
+        self.factory = RequestFactory()
+
+    def middleware(self, view):
+        # The rest of the stack turns a view's exception into a 500, as Django does
+        return QueryTimeoutMiddleware(convert_exception_to_response(view))
+
+    def test_budget_is_picked_by_path(self):
+        """Test that the first matching prefix sets the budget, QUERY_TIMEOUT the rest"""
+        self.assertEqual(budget_for("/api/users/users/"), 0.05)
+        self.assertEqual(budget_for("/admin/users/user/"), 0)
+        self.assertEqual(budget_for("/accounts/login/"), 0.1)
+
+    def test_query_over_budget_is_cancelled(self):
+        """Test that a query running past the budget is interrupted"""
+        with self.assertRaises(QueryTimeout), connection.execute_wrapper(QueryBudget("/api/", 0.05)):
+            with connection.cursor() as cursor:
+                cursor.execute(SLOW_QUERY)
+        # The connection is still usable
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    @mock.patch("django_project.timeouts.logger")
+    def test_cancelled_query_answers_503(self, logger):
+        """Test that a request whose query was cancelled gets a 503 and the query is logged"""
+        with self.assertLogs("django.request", level="ERROR"):
+            response = self.middleware(slow_view)(self.factory.get("/api/users/users/"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertIn("detail", json.loads(response.content))
+        self.assertIn("WITH RECURSIVE", logger.warning.call_args.args[0])
+
+    @mock.patch("django_project.timeouts.logger")
+    async def test_cancelled_query_answers_503_under_asgi(self, logger):
+        """Test that the budget also cancels queries run in sync_to_async threads"""
+        with self.assertLogs("django.request", level="ERROR"):
+            response = await self.middleware(async_slow_view)(AsyncRequestFactory().get("/api/users/users/"))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("WITH RECURSIVE", logger.warning.call_args.args[0])
+
+    def test_web_pages_get_a_plain_503(self):
+        """Test that pages outside /api/ get a plain text 503"""
+        with self.assertLogs("django.request", level="ERROR"):
+            response = self.middleware(slow_view)(self.factory.get("/accounts/profile/"))
+        self.assertEqual(response.status_code, 503)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    def test_fast_queries_pass(self):
+        """Test that queries within the budget are left alone"""
+        response = self.middleware(fast_view)(self.factory.get("/api/users/users/"))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(SLOW_QUERY_SECONDS=0)
+    @mock.patch("django_project.timeouts.logger")
+    def test_slow_queries_are_logged(self, logger):
+        """Test that queries slower than SLOW_QUERY_SECONDS are logged"""
+        self.middleware(fast_view)(self.factory.get("/admin/"))
+        self.assertIn("SELECT 1", logger.warning.call_args.args[0])
@@ -0,0 +1,156 @@
+"""
+Scoped API throttling backed by token buckets.
+
+Views opt in with a `throttle_scope` attribute; the rate for each scope comes from
+`REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]` in DRF's `"<requests>/<period>"` format.
+Scopes without a rate are not throttled.
+
+Anonymous requests are keyed by client IP. `X-Forwarded-For` is only trusted with
+`REST_FRAMEWORK["NUM_PROXIES"]` set (DRF then takes the address that many hops from
+the right); otherwise the key is `REMOTE_ADDR`, as a client could send a fresh header
+with every request. Views may also name request fields in `throttle_account_fields`
+(the login view: email and username): each submitted account then gets its own
+bucket too, so rotating addresses doesn't get around the rate for one account.
+
+Unlike DRF's `SimpleRateThrottle`, which stores and trims a list of request timestamps,
+a bucket is just `(tokens, updated_at)`, so every check is O(1) whatever the rate.
+"""
+
+import time
+from contextlib import suppress
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from loguru import logger
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from django_project.metrics import registry
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@cache
+def parse_rate(rate):
+    """Return `(capacity, tokens per second)` for a `"<requests>/<period>"` rate."""
+    num, period = rate.split("/")
+    capacity = int(num)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def take_token(state, now, capacity, refill_rate):
+    """
+    Refill the bucket `state` up to `now` and try to take one token from it.
+
+    Returns `(new_state, wait)` where `wait` is 0 when the token was granted, or the
+    number of seconds until one becomes available.
+    """
+    tokens, updated_at = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill_rate
+
+
+class LocalBucketStore:
+    """
+    Buckets kept in this process's memory.
+
+    Cheapest option, but every worker process throttles on its own. Updates are plain
+    dict reads and writes without a lock: two requests racing on the same key can both
+    be let through, which is an acceptable error for abuse protection.
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = {}
+
+    def consume(self, key, capacity, refill_rate):
+        state, wait = take_token(self._buckets.pop(key, None), time.monotonic(), capacity, refill_rate)
+        # Re-inserting keeps the dict ordered by last use, so the oldest key is evicted first
+        self._buckets[key] = state
+        if len(self._buckets) > self.max_keys:
+            # Another thread may have evicted or inserted keys concurrently
+            with suppress(KeyError, RuntimeError, StopIteration):
+                del self._buckets[next(iter(self._buckets))]
+        return wait
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Buckets kept in a Django cache, shared by every worker using that cache.
+
+    Like DRF's cache-based throttles this is a read-modify-write without locking.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def consume(self, key, capacity, refill_rate):
+        state, wait = take_token(self.cache.get(key), time.time(), capacity, refill_rate)
+        # Once the bucket would have refilled completely the entry carries no information
+        self.cache.set(key, state, timeout=int(capacity / refill_rate) + 1)
+        return wait
+
+    def clear(self):
+        self.cache.clear()
+
+
+@cache
+def get_store():
+    if settings.THROTTLE_CACHE:
+        return CacheBucketStore(settings.THROTTLE_CACHE)
+    return LocalBucketStore()
+
+
+@receiver(setting_changed)
+def reset_store(*, setting, **kwargs):
+    if setting in ("THROTTLE_CACHE", "REST_FRAMEWORK"):
+        get_store.cache_clear()
+
+
+class ScopedTokenBucketThrottle(BaseThrottle):
+    """
+    Throttle requests per `view.throttle_scope`, keyed by user id or client IP, and by
+    the accounts named in `view.throttle_account_fields`.
+    """
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+        scope = getattr(view, "throttle_scope", None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope) if scope else None
+        if rate is None:
+            return True
+
+        if request.user and request.user.is_authenticated:
+            idents = [f"user:{request.user.pk}"]
+        else:
+            idents = [f"ip:{self.get_ident(request)}"]
+        for field in getattr(view, "throttle_account_fields", ()):
+            value = request.data.get(field) if hasattr(request.data, "get") else None
+            if isinstance(value, str) and value.strip():
+                idents.append(f"account:{value.strip().lower()}")
+
+        capacity, refill_rate = parse_rate(rate)
+        for ident in idents:
+            self.wait_seconds = get_store().consume(f"throttle:{scope}:{ident}", capacity, refill_rate)
+            if self.wait_seconds:
+                registry.inc("api_throttled_requests_total", scope=scope)
+                logger.warning(f"Throttled {scope} request from {ident}, retry in {self.wait_seconds:.1f}s")
+                return False
+        return True
+
+    def get_ident(self, request):
+        # DRF would use a client-supplied X-Forwarded-For as is
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get("REMOTE_ADDR")
+        return super().get_ident(request)
+
+    def wait(self):
+        return self.wait_seconds
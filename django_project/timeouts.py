@@ -0,0 +1,131 @@
+"""
+Per-route time budgets for database queries.
+
+`QueryTimeoutMiddleware` gives every query of a request at most the seconds of the
+first `QUERY_TIMEOUTS` prefix matching its path (`QUERY_TIMEOUT` otherwise; 0 for
+no limit). A query over budget is cancelled by the database: PostgreSQL enforces
+`statement_timeout`, SQLite is interrupted from a progress handler (which bounds
+`execute()`: sorting, aggregating, skipping to an offset and finding the first row,
+not fetching the rows after it). The request then gets a 503 (with `Retry-After`)
+instead of holding its worker and connection, and the query is logged. Queries
+slower than `SLOW_QUERY_SECONDS` are logged too.
+
+The budget is installed with `request_wrapper()`, so it also covers the queries an
+async view or middleware runs in `sync_to_async` threads under ASGI.
+
+On PostgreSQL the timeout is set on the connection by the request's first query,
+only when it differs from the one already set, and stays until a request with a
+different budget changes it (a persistent connection keeps it between requests).
+If that first query is in a transaction that rolls back, so does the setting.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import OperationalError
+from django.http import HttpResponse, JsonResponse
+from loguru import logger
+
+from django_project.metrics import registry
+from django_project.middleware import HybridMiddleware
+from django_project.query_wrappers import request_wrapper
+
+# SQLite virtual machine instructions between two checks of the deadline
+PROGRESS_STEPS = 1000
+# PostgreSQL's SQLSTATE for a query cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+
+class QueryTimeout(OperationalError):
+    """A query was cancelled for running longer than the request's budget."""
+
+
+def budget_for(path):
+    """Seconds each query of a request to `path` may run; 0 for no limit."""
+    for prefix, seconds in settings.QUERY_TIMEOUTS.items():
+        if path.startswith(prefix):
+            return seconds
+    return settings.QUERY_TIMEOUT
+
+
+class QueryBudget:
+    """Execute wrapper enforcing a per-query timeout and logging slow queries."""
+
+    def __init__(self, path, seconds):
+        self.path = path
+        self.seconds = seconds
+        self.timed_out = False
+
+    def __call__(self, execute, sql, params, many, context):
+        db = context["connection"]
+        if db.vendor == "postgresql":
+            self.set_statement_timeout(db)
+        interruptible = db.vendor == "sqlite" and self.seconds
+        if interruptible:
+            deadline = time.monotonic() + self.seconds
+            db.connection.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as e:
+            if not self.is_timeout(db, e):
+                raise
+            self.timed_out = True
+            logger.warning(f"Query cancelled after {self.seconds}s on {self.path}: {sql[:1000]}")
+            raise QueryTimeout(f"Query cancelled after {self.seconds}s") from e
+        finally:
+            if interruptible:
+                db.connection.set_progress_handler(None, 0)
+            duration = time.perf_counter() - started
+            if not self.timed_out and duration >= settings.SLOW_QUERY_SECONDS:
+                logger.warning(f"Slow query ({duration:.3f}s) on {self.path}: {sql[:1000]}")
+
+    def set_statement_timeout(self, db):
+        # Keyed by the raw connection: a reconnect starts over from the server default
+        current = getattr(db, "statement_timeout", None)
+        if current != (db.connection, self.seconds):
+            with db.connection.cursor() as cursor:
+                cursor.execute(f"SET statement_timeout = {int(self.seconds * 1000)}")
+            db.statement_timeout = (db.connection, self.seconds)
+
+    def is_timeout(self, db, error):
+        if db.vendor == "postgresql":
+            return getattr(error.__cause__, "sqlstate", None) == QUERY_CANCELED
+        # What sqlite3 raises when the progress handler aborts a query
+        return db.vendor == "sqlite" and str(error) == "interrupted"
+
+
+class QueryTimeoutMiddleware(HybridMiddleware):
+    """
+    Enforce the route's query budget for the rest of the stack, and answer a
+    request whose query was cancelled with a 503.
+
+    Place it before MiddlewareProfiles so the session and authentication queries,
+    and both middleware stacks, are covered.
+    """
+
+    def call(self, request):
+        budget = QueryBudget(request.path_info, budget_for(request.path_info))
+        with request_wrapper(budget):
+            response = self.get_response(request)
+        return self.timed_out(request, response) if budget.timed_out else response
+
+    async def acall(self, request):
+        budget = QueryBudget(request.path_info, budget_for(request.path_info))
+        with request_wrapper(budget):
+            response = await self.get_response(request)
+        return self.timed_out(request, response) if budget.timed_out else response
+
+    def timed_out(self, request, response):
+        match = request.resolver_match
+        registry.inc("django_db_query_timeouts_total", route=match.route if match else "<unmatched>")
+        # A view that handled the error itself keeps its response
+        if response.status_code < 500:
+            return response
+        detail = "The request took too long. Please try again."
+        if request.path_info.startswith("/api/"):
+            response = JsonResponse({"detail": detail}, status=503)
+        else:
+            response = HttpResponse(detail, content_type="text/plain; charset=utf-8", status=503)
+        response["Retry-After"] = str(settings.QUERY_TIMEOUT_RETRY_AFTER)
+        return response
@@ -22,20 +22,19 @@ from django.contrib.auth.decorators import login_not_required
 from django.urls import include, path
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 from apps.accounts.views import PhoneChangeView, ProfileView
+from django_project.caching import cache_anonymous_page
+from django_project.metrics import metrics_view
 
 
 @method_decorator(login_not_required, name="dispatch")
+@method_decorator(cache_anonymous_page, name="dispatch")
 class IndexView(TemplateView):
     template_name = "index.html"
 
 
 urlpatterns = [
-    # ============================ Spectacular API documentation ===============================
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     # ============================ Admin ===============================
     path("admin/", admin.site.urls),
     # ============================ All Auth URLs ================================================
@@ -47,9 +46,39 @@ urlpatterns = [
     path("accounts/", include("allauth.urls")),
     # ============================ Users URLs ================================================
     path("api/users/", include("apps.api.users.urls", namespace="users")),
+    # ============================ Metrics ================================================
+    path("metrics", metrics_view, name="metrics"),
     path("", IndexView.as_view(), name="index"),
 ]
 
+if settings.ENABLE_API_DOCS:
+    from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+    from django_project import schema  # noqa: F401 (authentication extensions)
+
+    urlpatterns = [
+        # ============================ Spectacular API documentation ===============================
+        path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+        path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
+    ] + urlpatterns
+
+if settings.ENABLE_HEADLESS:
+    from allauth.headless import app_settings as headless_settings
+    from allauth.headless.base.views import ConfigView
+    from allauth.headless.constants import Client
+
+    from apps.accounts.social import cached_config
+
+    urlpatterns = [
+        # ============================ allauth headless ===============================
+        # The config endpoints (fetched by the SPA on every load) first, served from memory
+        *(
+            path(f"_allauth/{client.value}/v1/config", cached_config(ConfigView.as_api_view(client=client)))
+            for client in map(Client, headless_settings.CLIENTS)
+        ),
+        path("_allauth/", include("allauth.headless.urls")),
+    ] + urlpatterns
+
 if settings.DEBUG:
     import debug_toolbar
 